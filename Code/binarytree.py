@@ -4,6 +4,8 @@ from stack import Stack
 
 
 class BinaryTreeNode(object):
+    # Store the attributes in fixed slots rather than a dictionary per node
+    __slots__ = ('data', 'left', 'right')
 
     def __init__(self, data):
         """Initialize this binary tree node with the given data."""
@@ -13,6 +13,10 @@ class BinaryTreeNodeTest(unittest.TestCase):
         assert node.left is None
         assert node.right is None
 
+    def test_slots(self):
+        node = BinaryTreeNode(123)
+        assert not hasattr(node, '__dict__')
+
     def test_is_leaf(self):
         # Create node with no children
         node = BinaryTreeNode(2)
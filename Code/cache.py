@@ -0,0 +1,241 @@
+#!python
+
+import time
+from hashtable import HashTable
+from linkedlist import DoublyLinkedList, DoublyNode
+
+
+class _Entry(DoublyNode):
+    '''A node in a cache's recency list, holding a key and its value (in the
+       node's data).
+    '''
+    __slots__ = ('key', 'expires')
+
+    def __init__(self, key, data, expires=None):
+        """Initialize this entry with the given key, value and expiry time."""
+        super(_Entry, self).__init__(data)
+        self.key = key
+        self.expires = expires  # Clock time it expires at, or None
+
+
+class LRUCache(object):
+    '''A cache holding at most max_size entries, which evicts the least
+       recently used entry to make room for a new one.
+
+       A HashTable maps each key to its node in a DoublyLinkedList ordered
+       from least to most recently used, so both finding an entry and moving
+       it to the most recent end take O(1) time.
+    '''
+    def __init__(self, max_size=128, on_evict=None):
+        """Initialize this cache with the given maximum number of entries, and
+           a function to call with the key and value of each evicted entry.
+        """
+        if max_size < 1:
+            raise ValueError('Maximum size must be positive: '
+                             '{}'.format(max_size))
+        self.max_size = max_size
+        self.on_evict = on_evict
+        self.table = HashTable()  # Maps each key to its entry
+        self.order = DoublyLinkedList()  # Entries, least recently used first
+
+    def __repr__(self):
+        """Return a string representation of this cache."""
+        return '{}({!r})'.format(type(self).__name__, self.items())
+
+    def __len__(self):
+        """Return the number of entries in this cache."""
+        return self.length()
+
+    def __contains__(self, key):
+        """Return True if this cache contains the given key, or False."""
+        return self.contains(key)
+
+    def length(self):
+        """Return the number of entries in this cache."""
+        return self.table.length()
+
+    def _remove(self, entry):
+        """Remove the given entry from this cache."""
+        self.order.remove_node(entry)
+        self.table.delete(entry.key)
+
+    def _evict(self, entry):
+        """Remove the given entry from this cache, and pass its key and value
+           to the eviction callback, if any.
+        """
+        self._remove(entry)
+        if self.on_evict is not None:
+            self.on_evict(entry.key, entry.data)
+
+    def _lookup(self, key):
+        """Return the entry for the given key, or None."""
+        try:
+            return self.table.get(key)
+        except KeyError:
+            return None
+
+    def contains(self, key):
+        """Return True if this cache contains the given key, or False. This
+           does not count as a use of the key.
+
+           Average running time: O(1)
+
+        """
+        return self._lookup(key) is not None
+
+    def get(self, key):
+        """Return the value cached for the given key, or raise KeyError, and
+           mark the key as the most recently used.
+
+           Average running time: O(1)
+
+        """
+        entry = self._lookup(key)
+        if entry is None:
+            raise KeyError('Key not found: {}'.format(key))
+        self.order.remove_node(entry)
+        self.order.append_node(entry)
+        return entry.data
+
+    def put(self, key, value):
+        """Cache the given value for the given key, as the most recently used,
+           evicting the least recently used entry if the cache is full.
+
+           Average running time: O(1)
+
+        """
+        self._put(key, value)
+
+    def _make_room(self):
+        """Evict the least recently used entry, since this cache is full."""
+        self._evict(self.order.head)
+
+    def _put(self, key, value):
+        """Cache the given value for the given key, and return its entry."""
+        entry = self._lookup(key)
+        if entry is not None:
+            self.order.remove_node(entry)
+            entry.data = value
+        else:
+            if self.length() >= self.max_size:
+                self._make_room()
+            entry = _Entry(key, value)
+            self.table.set(key, entry)
+        return self.order.append_node(entry)
+
+    def delete(self, key):
+        """Remove the given key from this cache, or raise KeyError. This does
+           not call the eviction callback.
+
+           Average running time: O(1)
+
+        """
+        entry = self._lookup(key)
+        if entry is None:
+            raise KeyError('Key not found: {}'.format(key))
+        self._remove(entry)
+
+    def clear(self):
+        """Remove all entries from this cache, without calling the eviction
+           callback.
+        """
+        self.table = HashTable()
+        self.order = DoublyLinkedList()
+
+    def _iter_entries(self):
+        """Return a generator of the entries in this cache, from least to most
+           recently used.
+        """
+        entry = self.order.head
+        while entry is not None:
+            # Read the next entry first, in case this one is removed
+            next_entry = entry.next
+            yield entry
+            entry = next_entry
+
+    def keys(self):
+        """Return a list of the keys in this cache, from least to most
+           recently used.
+        """
+        return [entry.key for entry in self._iter_entries()]
+
+    def items(self):
+        """Return a list of the (key, value) pairs in this cache, from least
+           to most recently used.
+        """
+        return [(entry.key, entry.data) for entry in self._iter_entries()]
+
+
+class TTLCache(LRUCache):
+    '''An LRUCache whose entries also expire a time to live after they are
+       put. Expired entries are evicted when they are next looked up, or by
+       calling expire.
+    '''
+    def __init__(self, max_size=128, ttl=60, on_evict=None,
+                 clock=time.monotonic):
+        """Initialize this cache with the given maximum number of entries,
+           default time to live in seconds, function to call with the key and
+           value of each evicted entry (whether expired or least recently
+           used), and function returning the current time in seconds.
+        """
+        super(TTLCache, self).__init__(max_size, on_evict)
+        self.ttl = ttl
+        self.clock = clock
+        # No entry expires before this time, though one may expire later
+        self.next_expiry = float('inf')
+
+    def _lookup(self, key):
+        """Return the entry for the given key, or None, evicting the entry
+           first if it has expired.
+        """
+        entry = super(TTLCache, self)._lookup(key)
+        if entry is not None and entry.expires <= self.clock():
+            self._evict(entry)
+            return None
+        return entry
+
+    def put(self, key, value, ttl=None):
+        """Cache the given value for the given key, as the most recently used,
+           to expire after the given time to live in seconds (by default, this
+           cache's ttl), evicting the least recently used entry if the cache
+           is full.
+
+           Average running time: O(1)
+
+        """
+        entry = self._put(key, value)
+        entry.expires = self.clock() + (self.ttl if ttl is None else ttl)
+        self.next_expiry = min(self.next_expiry, entry.expires)
+
+    def _make_room(self):
+        """Evict all expired entries, since this cache is full, or else the
+           least recently used entry if none have expired.
+
+           Entries with their own time to live do not expire in recency
+           order, so an expired entry may sit anywhere in the list. We only
+           search for them once the earliest expiry time has passed.
+
+        """
+        if self.next_expiry <= self.clock() and self.expire() > 0:
+            return None
+        super(TTLCache, self)._make_room()
+
+    def expire(self):
+        """Evict all expired entries from this cache, and return how many
+           were evicted.
+
+           Best and worst case running time: O(n), since entries with their
+           own time to live do not expire in recency order.
+
+        """
+        now = self.clock()
+        expired = []
+        self.next_expiry = float('inf')
+        for entry in self._iter_entries():
+            if entry.expires <= now:
+                expired.append(entry)
+            else:
+                self.next_expiry = min(self.next_expiry, entry.expires)
+        for entry in expired:
+            self._evict(entry)
+        return len(expired)
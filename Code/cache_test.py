@@ -0,0 +1,166 @@
+#!python
+
+from cache import LRUCache, TTLCache
+import unittest
+
+
+class FakeClock(object):
+    '''A clock for tests, which only moves when told to.'''
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_init(self):
+        cache = LRUCache(3)
+        assert cache.max_size == 3
+        assert cache.length() == 0
+        assert cache.items() == []
+        with self.assertRaises(ValueError):
+            LRUCache(0)
+
+    def test_put_and_get(self):
+        cache = LRUCache(3)
+        cache.put('I', 1)
+        cache.put('V', 5)
+        cache.put('I', 'one')  # Update value
+        assert cache.get('I') == 'one'
+        assert cache.get('V') == 5
+        assert len(cache) == 2
+        assert 'V' in cache
+        assert cache.contains('X') is False
+        with self.assertRaises(KeyError):
+            cache.get('X')  # Key does not exist
+
+    def test_evicts_least_recently_used(self):
+        evicted = []
+        cache = LRUCache(3, on_evict=lambda key, value:
+                         evicted.append((key, value)))
+        for key in ('I', 'V', 'X'):
+            cache.put(key, key.lower())
+        assert cache.get('I') == 'i'  # Now V is the least recently used
+        cache.put('L', 'l')
+        assert evicted == [('V', 'v')]
+        assert cache.keys() == ['X', 'I', 'L']
+        cache.put('X', 'ten')  # Updating also counts as a use
+        cache.put('C', 'c')
+        assert evicted == [('V', 'v'), ('I', 'i')]
+        assert cache.items() == [('L', 'l'), ('X', 'ten'), ('C', 'c')]
+
+    def test_contains_is_not_a_use(self):
+        cache = LRUCache(2)
+        cache.put('I', 1)
+        cache.put('V', 5)
+        assert cache.contains('I') is True
+        cache.put('X', 10)
+        assert cache.keys() == ['V', 'X']
+
+    def test_delete_and_clear(self):
+        evicted = []
+        cache = LRUCache(3, on_evict=lambda key, value: evicted.append(key))
+        for key in ('I', 'V', 'X'):
+            cache.put(key, key.lower())
+        cache.delete('V')
+        assert cache.keys() == ['I', 'X']
+        with self.assertRaises(KeyError):
+            cache.delete('V')  # Key no longer exists
+        cache.clear()
+        assert cache.length() == 0
+        assert cache.keys() == []
+        assert evicted == []  # Removing entries is not evicting them
+        cache.put('L', 50)
+        assert cache.items() == [('L', 50)]
+
+    def test_many_entries(self):
+        cache = LRUCache(100)
+        for number in range(1000):
+            cache.put(number, number * number)
+        assert cache.length() == 100
+        assert cache.keys() == list(range(900, 1000))
+        assert cache.get(950) == 902500
+
+
+class TTLCacheTest(unittest.TestCase):
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        evicted = []
+        cache = TTLCache(10, ttl=60, clock=clock,
+                         on_evict=lambda key, value: evicted.append(key))
+        cache.put('I', 1)
+        cache.put('V', 5, ttl=10)  # Own time to live
+        clock.now = 30
+        assert cache.get('I') == 1
+        assert cache.contains('V') is False  # Expired at 10
+        assert evicted == ['V']
+        with self.assertRaises(KeyError):
+            cache.get('V')
+        clock.now = 60
+        assert cache.contains('I') is False  # Expired at 60
+        assert evicted == ['V', 'I']
+        assert cache.length() == 0
+
+    def test_put_renews_expiry(self):
+        clock = FakeClock()
+        cache = TTLCache(10, ttl=60, clock=clock)
+        cache.put('I', 1)
+        clock.now = 50
+        cache.put('I', 'one')
+        clock.now = 100
+        assert cache.get('I') == 'one'
+
+    def test_expire(self):
+        clock = FakeClock()
+        evicted = []
+        cache = TTLCache(10, ttl=60, clock=clock,
+                         on_evict=lambda key, value: evicted.append(key))
+        cache.put('I', 1, ttl=5)
+        cache.put('V', 5)
+        cache.put('X', 10, ttl=20)
+        clock.now = 30
+        assert cache.expire() == 2
+        assert evicted == ['I', 'X']
+        assert cache.keys() == ['V']
+        assert cache.expire() == 0
+
+    def test_full_cache_drops_expired_entries_first(self):
+        clock = FakeClock()
+        evicted = []
+        cache = TTLCache(3, ttl=100, clock=clock,
+                         on_evict=lambda key, value: evicted.append(key))
+        cache.put('I', 1)
+        cache.put('V', 5, ttl=10)  # Expires before the others
+        cache.put('X', 10)
+        clock.now = 20
+        cache.put('L', 50)  # I is least recently used, but V has expired
+        assert evicted == ['V']
+        assert cache.keys() == ['I', 'X', 'L']
+        cache.put('C', 100)  # Nothing has expired, so evict I
+        assert evicted == ['V', 'I']
+        assert cache.keys() == ['X', 'L', 'C']
+        cache.put('D', 500, ttl=5)
+        clock.now = 30
+        cache.put('M', 1000)  # D expired, though it was most recently used
+        assert evicted == ['V', 'I', 'X', 'D']
+        assert cache.keys() == ['L', 'C', 'M']
+
+    def test_evicts_least_recently_used(self):
+        clock = FakeClock()
+        evicted = []
+        cache = TTLCache(2, ttl=60, clock=clock,
+                         on_evict=lambda key, value: evicted.append(key))
+        cache.put('I', 1)
+        cache.put('V', 5)
+        cache.get('I')
+        cache.put('X', 10)
+        assert evicted == ['V']
+        assert cache.keys() == ['I', 'X']
+
+
+if __name__ == '__main__':
+    unittest.main()
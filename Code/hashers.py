@@ -0,0 +1,184 @@
+#!python
+
+import numbers
+import os
+import struct
+
+
+_MASK_64 = 0xffffffffffffffff
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+_WORD = struct.Struct('<Q')  # a 64-bit little-endian word
+
+
+def fnv1a_64(data, offset=_FNV_OFFSET):
+    """Return the 64-bit FNV-1a hash of the given bytes, as an unsigned int.
+       Unlike hash(), this gives the same result in every process.
+
+       Running time: O(m) for m bytes, with a multiply per byte, which makes
+       it fast to compute, but easy for an attacker to find collisions for.
+
+    """
+    hash_code = offset
+    for byte in data:
+        hash_code = ((hash_code ^ byte) * _FNV_PRIME) & _MASK_64
+    return hash_code
+
+
+def _rotate_left(word, bits):
+    """Return the given 64-bit word rotated left by the given bits."""
+    return ((word << bits) | (word >> (64 - bits))) & _MASK_64
+
+
+def _sip_rounds(v0, v1, v2, v3, rounds):
+    """Return the four SipHash state words after the given number of rounds.
+    """
+    for i in range(rounds):
+        v0 = (v0 + v1) & _MASK_64
+        v1 = _rotate_left(v1, 13) ^ v0
+        v0 = _rotate_left(v0, 32)
+        v2 = (v2 + v3) & _MASK_64
+        v3 = _rotate_left(v3, 16) ^ v2
+        v0 = (v0 + v3) & _MASK_64
+        v3 = _rotate_left(v3, 21) ^ v0
+        v2 = (v2 + v1) & _MASK_64
+        v1 = _rotate_left(v1, 17) ^ v2
+        v2 = _rotate_left(v2, 32)
+    return v0, v1, v2, v3
+
+
+def siphash_2_4(secret, data):
+    """Return the 64-bit SipHash-2-4 of the given bytes under the given 16
+       byte secret, as an unsigned int. Without the secret, an attacker
+       cannot predict which inputs collide.
+
+       Running time: O(m) for m bytes, processed 8 bytes at a time.
+
+    """
+    if len(secret) != 16:
+        raise ValueError('SipHash secret must be 16 bytes: '
+                         '{!r}'.format(secret))
+    k0, k1 = struct.unpack('<QQ', secret)
+    v0 = k0 ^ 0x736f6d6570736575
+    v1 = k1 ^ 0x646f72616e646f6d
+    v2 = k0 ^ 0x6c7967656e657261
+    v3 = k1 ^ 0x7465646279746573
+    end = len(data) - len(data) % 8
+    for start in range(0, end, 8):
+        word = _WORD.unpack_from(data, start)[0]
+        v3 ^= word
+        v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+        v0 ^= word
+    # The last word holds the leftover bytes, and the length in its top byte
+    word = ((len(data) & 0xff) << 56) | int.from_bytes(data[end:], 'little')
+    v3 ^= word
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+    v0 ^= word
+    v2 ^= 0xff
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def _plain_number(number):
+    """Return the int or float equal to the given number (like a Fraction,
+       Decimal or complex), or the number itself if there is none.
+    """
+    if isinstance(number, complex):
+        if number.imag != 0:
+            return number
+        number = number.real
+    for convert in (int, float):
+        try:
+            plain = convert(number)
+        except (TypeError, ValueError, OverflowError):
+            continue
+        if plain == number:
+            return plain
+    return number
+
+
+def key_bytes(key):
+    """Return bytes representing the given key, such that keys which are
+       equal (like 1, 1.0, True, Fraction(1) and 1+0j) give equal bytes.
+
+       Strings, bytes, numbers and tuples of them are encoded by value, with
+       any number equal to an int or float encoded as that int or float.
+       Any other key is encoded by its hash(), so a hasher cannot spread
+       those keys out any better than hash() itself.
+
+    """
+    if isinstance(key, str):
+        return b's' + key.encode('utf-8', 'surrogatepass')
+    if isinstance(key, bytes):
+        return b'b' + key
+    if (isinstance(key, numbers.Number) and
+            not isinstance(key, (int, float))):
+        key = _plain_number(key)
+    if isinstance(key, float) and key.is_integer():
+        key = int(key)
+    if isinstance(key, int):
+        return b'i' + str(int(key)).encode('ascii')
+    if isinstance(key, float):
+        return b'f' + repr(key).encode('ascii')
+    if isinstance(key, tuple):
+        parts = [key_bytes(item) for item in key]
+        return b't' + b''.join(_WORD.pack(len(part)) + part
+                               for part in parts)
+    return b'h' + _WORD.pack(hash(key) & _MASK_64)
+
+
+def _signed(hash_code):
+    """Return the given unsigned 64-bit hash code as a signed one, in the
+       same range as hash(), so it can be stored wherever hash() can be.
+    """
+    if hash_code >= 1 << 63:
+        hash_code -= 1 << 64
+    return hash_code
+
+
+class FNVHasher(object):
+    '''A fast, non-cryptographic hash function for hash table keys, based on
+       FNV-1a. Use it where keys are trusted, and the same hash codes are
+       wanted in every process.
+    '''
+    def __init__(self, seed=0):
+        """Initialize this hasher, mixing the given int seed into the hash."""
+        self.offset = (_FNV_OFFSET ^ seed) & _MASK_64
+
+    def __repr__(self):
+        """Return a string representation of this hasher."""
+        return 'FNVHasher()'
+
+    def __call__(self, key):
+        """Return the hash code of the given key."""
+        return _signed(fnv1a_64(key_bytes(key), self.offset))
+
+
+class SipHasher(object):
+    '''A keyed hash function for hash table keys, based on SipHash-2-4. Use
+       it where keys come from clients: without the secret, they cannot
+       choose keys that all collide and turn lookups into O(n) scans.
+
+       Python seeds hash() of str and bytes the same way, but hash() of an
+       int is the int itself, so int keys are easy to make collide.
+    '''
+    def __init__(self, secret=None):
+        """Initialize this hasher with the given 16 byte secret, or a random
+           one if none is given.
+        """
+        if secret is None:
+            secret = os.urandom(16)
+        if len(secret) != 16:
+            raise ValueError('SipHash secret must be 16 bytes: '
+                             '{!r}'.format(secret))
+        self.secret = secret
+
+    def __repr__(self):
+        """Return a string representation of this hasher, without the
+           secret.
+        """
+        return 'SipHasher()'
+
+    def __call__(self, key):
+        """Return the hash code of the given key."""
+        return _signed(siphash_2_4(self.secret, key_bytes(key)))
@@ -0,0 +1,71 @@
+#!python
+
+from hashers import fnv1a_64, siphash_2_4, key_bytes, FNVHasher, SipHasher
+from hashtable import HashTable
+from decimal import Decimal
+from fractions import Fraction
+import unittest
+
+
+class HashFunctionsTest(unittest.TestCase):
+
+    def test_fnv1a_64(self):
+        assert fnv1a_64(b'') == 0xcbf29ce484222325
+        assert fnv1a_64(b'a') == 0xaf63dc4c8601ec8c
+        assert fnv1a_64(b'foobar') == 0x85944171f73967e8
+
+    def test_siphash_2_4(self):
+        # Test vectors from the SipHash paper, with secret 00 01 ... 0f
+        secret = bytes(range(16))
+        assert siphash_2_4(secret, b'') == 0x726fdb47dd0e0e31
+        assert siphash_2_4(secret, bytes(range(8))) == 0x93f5f5799a932462
+        assert siphash_2_4(secret, bytes(range(15))) == 0xa129ca6149be45e5
+        with self.assertRaises(ValueError):
+            siphash_2_4(b'short', b'')
+
+    def test_key_bytes(self):
+        assert key_bytes(1) == key_bytes(1.0) == key_bytes(True)
+        assert key_bytes('1') != key_bytes(1)
+        assert key_bytes('a') != key_bytes(b'a')
+        assert key_bytes(('a', 'b')) != key_bytes(('ab',))
+        assert key_bytes(frozenset([1])) == key_bytes(frozenset([1]))
+
+    def test_key_bytes_of_equal_numbers(self):
+        assert key_bytes(Fraction(1, 2)) == key_bytes(0.5)
+        assert key_bytes(Decimal('0.5')) == key_bytes(0.5)
+        assert key_bytes(Decimal(1)) == key_bytes(1)
+        assert key_bytes(Fraction(10 ** 30)) == key_bytes(10 ** 30)
+        assert key_bytes(1 + 0j) == key_bytes(1)
+        assert key_bytes(0.5 + 0j) == key_bytes(0.5)
+        assert key_bytes(1 + 1j) != key_bytes(1)
+        assert key_bytes(Fraction(1, 3)) != key_bytes(1 / 3)  # Not equal
+        ht = HashTable(hasher=FNVHasher())
+        ht.set(0.5, 'half')
+        ht.set(1, 'one')
+        assert Fraction(1, 2) in ht
+        assert ht.get(Decimal(1)) == 'one'
+        assert ht.get(1 + 0j) == 'one'
+
+
+class HasherTest(unittest.TestCase):
+
+    def test_fnv_hasher(self):
+        hasher = FNVHasher()
+        assert hasher('route') == FNVHasher()('route')  # Not randomized
+        assert hasher('route') != FNVHasher(seed=1)('route')
+        assert -2 ** 63 <= hasher('route') < 2 ** 63
+
+    def test_sip_hasher(self):
+        secret = bytes(range(16))
+        hasher = SipHasher(secret)
+        assert hasher('route') == SipHasher(secret)('route')
+        assert hasher('route') != SipHasher(bytes(16))('route')
+        assert hasher('route') != SipHasher()('route')  # Random secret
+        assert -2 ** 63 <= hasher(12345) < 2 ** 63
+        assert repr(hasher) == 'SipHasher()'  # Does not give away the secret
+        with self.assertRaises(ValueError):
+            SipHasher(b'short')
+
+
+if __name__ == '__main__':
+    unittest.main()
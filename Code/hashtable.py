@@ -1,14 +1,234 @@
 #!python
 
+from array import array
+import random
+import sys
+import threading
+import time
 from linkedlist import LinkedList
 
 
+# Marks a slot whose entry was deleted, so that probing continues past it
+_DELETED = object()
+# Marks a slot that has never held an entry, where a key may be None
+_EMPTY = object()
+_MASK_64 = 0xffffffffffffffff
+
+
+def _fold_64(hash_code):
+    """Return the given int hash code folded into the signed 64-bit range,
+       so it can be packed into an array('q') whatever the hasher returns.
+    """
+    return ((hash_code + (1 << 63)) & _MASK_64) - (1 << 63)
+
+
+def _next_power_of_two(number):
+    """Return the smallest power of two that is at least the given number."""
+    power = 1
+    while power < number:
+        power *= 2
+    return power
+
+
+class ResizePolicy(object):
+    '''Decides when a hash table should grow or shrink, and to what size.'''
+    def __init__(self, grow_at=0.75, shrink_at=0.2, factor=2, min_size=8,
+                 compact_at=0.25):
+        """Initialize this policy to grow a table by the given factor once its
+           load factor exceeds grow_at, and shrink it by the same factor once
+           its load factor drops below shrink_at, but not below min_size
+           (rounded up to a power of two, like every table's size). An
+           open addressing table is compacted (rehashed to drop tombstones)
+           once they fill more than compact_at of its slots.
+
+           A shrink_at of 0 turns shrinking off. Otherwise, shrink_at times
+           the factor must be below grow_at: this gap (hysteresis) means a
+           table that just grew is not sparse enough to shrink, and a table
+           that just shrank is not full enough to grow, so a key being set and
+           deleted over and over at the threshold cannot make it thrash.
+
+        """
+        if not 0 < grow_at:
+            raise ValueError('grow_at must be positive: {}'.format(grow_at))
+        if factor < 2 or int(factor) != factor:
+            raise ValueError('factor must be an integer of at least 2: '
+                             '{}'.format(factor))
+        if not 0 <= shrink_at * factor < grow_at:
+            raise ValueError('shrink_at must be at least 0, and less than '
+                             'grow_at / factor: {}'.format(shrink_at))
+        if not 0 < compact_at:
+            raise ValueError('compact_at must be positive: '
+                             '{}'.format(compact_at))
+        self.grow_at = grow_at
+        self.shrink_at = shrink_at
+        self.factor = int(factor)
+        # Tables round their sizes up to a power of two, so a minimum that
+        # is not one would let a table "shrink" back to its current size
+        self.min_size = _next_power_of_two(min_size)
+        self.compact_at = compact_at
+
+    def __repr__(self):
+        """Return a string representation of this policy."""
+        return 'ResizePolicy(grow_at={!r}, shrink_at={!r}, factor={!r}, ' \
+               'min_size={!r}, compact_at={!r})'.format(
+                   self.grow_at, self.shrink_at, self.factor, self.min_size,
+                   self.compact_at)
+
+    def should_grow(self, num_entries, num_buckets):
+        """Return True if a table with the given number of entries and
+           buckets has exceeded the load factor to grow at, or False.
+        """
+        return num_entries / num_buckets > self.grow_at
+
+    def should_shrink(self, num_entries, num_buckets):
+        """Return True if a table with the given number of entries and
+           buckets has fallen below the load factor to shrink at, or False.
+        """
+        return (num_buckets > self.min_size and
+                num_entries / num_buckets < self.shrink_at)
+
+    def should_compact(self, num_deleted, num_buckets):
+        """Return True if a table with the given number of tombstones and
+           buckets has exceeded the ratio of tombstones to compact at, or
+           False.
+        """
+        return num_deleted / num_buckets > self.compact_at
+
+    def grown_size(self, num_buckets):
+        """Return the number of buckets to grow the given number to."""
+        return num_buckets * self.factor
+
+    def shrunk_size(self, num_buckets):
+        """Return the number of buckets to shrink the given number to."""
+        return max(self.min_size, num_buckets // self.factor)
+
+    def buckets_needed(self, num_entries):
+        """Return the number of buckets that holds the given number of entries
+           without exceeding the load factor to grow at.
+        """
+        return int(num_entries / self.grow_at) + 1
+
+
+class TableStats(object):
+    '''Counters of the work done by a hash table, to tune its initial size
+       and resize policy from real data rather than asymptotic bounds.
+    '''
+    def __init__(self):
+        """Initialize all the counters to zero."""
+        self.hits = 0  # Lookups that found their key
+        self.misses = 0  # Lookups that did not
+        # Number of lookups that examined each number of entries or slots
+        self.probe_lengths = {}
+        self.inserts = 0  # Entries added with new keys
+        self.collisions = 0  # Inserts that did not land in an empty spot
+        self.resizes = 0
+        self.resize_seconds = 0.0  # Time spent resizing and rehashing
+
+    def record_lookup(self, probes, found):
+        """Count a lookup that examined the given number of entries or slots,
+           and either found its key or not.
+        """
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.probe_lengths[probes] = self.probe_lengths.get(probes, 0) + 1
+
+    def record_insert(self, collided):
+        """Count an insert of a new key, that either collided or not."""
+        self.inserts += 1
+        if collided:
+            self.collisions += 1
+
+    def report(self):
+        """Return a dictionary of these counters, and the ratios between
+           them (or None for a ratio of two zero counts).
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else None,
+            'probe_lengths': dict(sorted(self.probe_lengths.items())),
+            'inserts': self.inserts,
+            'collisions': self.collisions,
+            'collisions_per_insert': (self.collisions / self.inserts
+                                      if self.inserts else None),
+            'resizes': self.resizes,
+            'resize_seconds': self.resize_seconds,
+        }
+
+
+def _object_size(obj):
+    """Return the number of bytes used by the given object, including its
+       attribute dictionary if it has one.
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
 class HashTable(object):
-    '''A hash table that resolves collisions using separate chaining.'''
-    def __init__(self, init_size=8):
-        """Initialize this hash table with the given initial size."""
-        self.buckets = [LinkedList() for i in range(init_size)]
+    '''A hash table that resolves collisions using separate chaining.
+
+       Each bucket is a LinkedList of (hash code, key, value) entries, so that
+       keys are only compared with == once their cached hash codes match, and
+       rehashing never calls hash() again. A bucket is None until its first
+       entry is added, so making room for more buckets only allocates a list
+       of references, not a LinkedList for each of them.
+    '''
+    # Number of old buckets moved over by each operation during a resize
+    REHASH_STEP = 4
+    # When to resize, if no policy is given
+    DEFAULT_POLICY = ResizePolicy()
+    # The TableStats being recorded, or None if they are not
+    counters = None
+
+    def __init__(self, init_size=8, policy=None, hasher=None,
+                 track_stats=False):
+        """Initialize this hash table with the given initial size, the
+           ResizePolicy that decides when it grows and shrinks, and the hash
+           function for its keys (by default, the built-in hash). If
+           track_stats is True, it counts the work it does (see stats).
+
+           The number of buckets is rounded up to a power of two, so that a
+           key's bucket index is the low bits of its hash code, picked out by
+           masking instead of the slower modulo.
+        """
+        num_buckets = _next_power_of_two(init_size)
+        self.buckets = [None] * num_buckets  # LinkedLists, made when needed
         self.size = 0  # Number of key-value entries
+        self.policy = self.DEFAULT_POLICY if policy is None else policy
+        self.hasher = hash if hasher is None else hasher
+        if track_stats:
+            self.counters = TableStats()
+        # While resizing, the buckets not yet moved into self.buckets
+        self.old_buckets = None
+        self.rehash_index = 0  # Index of the next old bucket to move
+
+    @classmethod
+    def from_items(cls, items, expected_size=None, policy=None,
+                   hasher=None):
+        """Return a new hash table holding the given key-value pairs, with
+           enough buckets for expected_size entries (by default, the number
+           of items given) so that it never resizes while loading them.
+           It uses the given ResizePolicy and hasher, or the default ones.
+
+           Best and worst case running time: O(n), because each entry is
+           hashed only once, rather than again after each doubling.
+
+        """
+        if expected_size is None:
+            items = list(items)
+            expected_size = len(items)
+        if policy is None:
+            policy = cls.DEFAULT_POLICY
+        init_size = max(8, policy.buckets_needed(expected_size))
+        table = cls(init_size, policy=policy, hasher=hasher)
+        for key, value in items:
+            table.set(key, value)
+        return table
 
     def __str__(self):
         """Return a formatted string representation of this hash table."""
@@ -19,9 +239,166 @@ class HashTable(object):
         """Return a string representation of this hash table."""
         return 'HashTable({!r})'.format(self.items())
 
-    def _bucket_index(self, key):
-        """Return the bucket index where the given key would be stored."""
-        return hash(key) % len(self.buckets)
+    def __len__(self):
+        """Return the number of key-value entries in this hash table."""
+        return self.length()
+
+    def __iter__(self):
+        """Return a generator of the keys in this hash table."""
+        return self.iter_keys()
+
+    def __contains__(self, key):
+        """Return True if this hash table contains the given key, or False."""
+        return self.contains(key)
+
+    def __getitem__(self, key):
+        """Return the value associated with the given key, or raise KeyError.
+        """
+        return self.get(key)
+
+    def _num_buckets(self):
+        """Return the number of buckets (or slots) in this hash table."""
+        return len(self.buckets)
+
+    def _bucket(self, hash_code):
+        """Return the bucket a key with the given hash code belongs in, or
+           None if no entry was ever added to it.
+           If this hash table is in the middle of a resize, first take a step
+           of the rehash, and move over the old bucket that the key would
+           still be stored in.
+
+           Best and worst case running time: O(1) on average, because each
+           call moves over at most REHASH_STEP + 1 old buckets, each holding
+           a number of entries bounded by the load factor.
+
+        """
+        if self.old_buckets is not None:
+            if self.counters is not None:
+                start = time.perf_counter()
+            self._move_bucket(hash_code & (len(self.old_buckets) - 1))
+            self._rehash_step()
+            if self.counters is not None:
+                self.counters.resize_seconds += time.perf_counter() - start
+        return self.buckets[hash_code & (len(self.buckets) - 1)]
+
+    def _record_lookup(self, bucket, node):
+        """Count a lookup in the given bucket that found the given node (or
+           None), with the number of entries it compared along the way.
+        """
+        probes = 0
+        current = None if bucket is None else bucket.head
+        while current is not None:
+            probes += 1
+            if current is node:
+                break
+            current = current.next
+        self.counters.record_lookup(probes, node is not None)
+
+    def _find_node(self, bucket, hash_code, key):
+        """Return the node in the given bucket (which may be None) holding
+           the entry with the given key and hash code, or None if there is
+           no such entry.
+
+           Best case running time: O(1) if the entry is at the head node.
+
+           Worst case running time: O(l) for a bucket of l entries. Unlike
+           LinkedList.find, this walks the nodes directly, so no function is
+           created and called per entry, and the cheap comparison of hash
+           codes rules out most entries before their keys are compared.
+        """
+        if bucket is None:
+            return None
+        node = bucket.head
+        while node is not None:
+            entry = node.data
+            if entry[0] == hash_code and entry[1] == key:
+                return node
+            node = node.next
+        return None
+
+    def _find_previous(self, bucket, hash_code, key):
+        """Return the node before the one holding the entry with the given
+           key and hash code in the given bucket (or None if that one is the
+           head), and the node holding it, or (None, None) if there is no
+           such entry.
+
+           Best and worst case running time: the same as _find_node, since
+           this is one walk along the bucket, keeping the previous node.
+        """
+        if bucket is None:
+            return None, None
+        previous = None
+        node = bucket.head
+        while node is not None:
+            entry = node.data
+            if entry[0] == hash_code and entry[1] == key:
+                return previous, node
+            previous, node = node, node.next
+        return None, None
+
+    def _unlink(self, bucket, previous, node):
+        """Remove the given node, which follows the given previous node (or
+           None if it is the head), from the given bucket in O(1) time, with
+           no second walk along the bucket comparing entries.
+        """
+        if previous is None:
+            bucket.head = node.next
+        else:
+            previous.next = node.next
+        if bucket.tail is node:
+            bucket.tail = previous
+        node.next = None
+        bucket.size -= 1
+
+    def _append_entry(self, entry):
+        """Append the given (hash code, key, value) entry to the bucket it
+           belongs in, first creating that bucket if it has none yet.
+        """
+        index = entry[0] & (len(self.buckets) - 1)
+        bucket = self.buckets[index]
+        if bucket is None:
+            bucket = self.buckets[index] = LinkedList()
+        bucket.append(entry)
+
+    def _move_bucket(self, old_index):
+        """Rehash the entries of the old bucket at the given index into the
+           new buckets, unless it was already moved over.
+        """
+        old_bucket = self.old_buckets[old_index]
+        if old_bucket is not None:
+            for entry in old_bucket:
+                self._append_entry(entry)
+            self.old_buckets[old_index] = None
+
+    def _rehash_step(self):
+        """Move over the next REHASH_STEP old buckets, and finish the resize
+           once none remain.
+        """
+        stop = min(self.rehash_index + self.REHASH_STEP,
+                   len(self.old_buckets))
+        for old_index in range(self.rehash_index, stop):
+            self._move_bucket(old_index)
+        self.rehash_index = stop
+        if self.rehash_index == len(self.old_buckets):
+            self.old_buckets = None
+            self.rehash_index = 0
+
+    def _finish_resize(self):
+        """Move over all the old buckets of a resize in progress, if any."""
+        while self.old_buckets is not None:
+            self._rehash_step()
+
+    def _all_buckets(self):
+        """Return a generator of all buckets that were created, including
+           the old buckets not yet moved over by a resize in progress.
+        """
+        if self.old_buckets is not None:
+            for bucket in self.old_buckets:
+                if bucket is not None:
+                    yield bucket
+        for bucket in self.buckets:
+            if bucket is not None:
+                yield bucket
 
     def load_factor(self):
         """Return the load factor, the ratio of number of entries to buckets.
@@ -32,6 +409,39 @@ class HashTable(object):
         # Calculate load factor
         return (self.length() / len(self.buckets))
 
+    def iter_items(self):
+        """Return a generator of all entries (key-value pairs) in this hash
+           table, without building a list of them first. The hash table must
+           not be changed while the generator is in use, though it may be
+           read from.
+           Best and worst case running time: O(n) to exhaust the generator,
+           O(1) extra space.
+        """
+        # Even a lookup moves old buckets over during a resize, maybe into
+        # new buckets we have yet to visit, which would then repeat their
+        # entries. So finish any resize first, in O(n) like the iteration.
+        self._finish_resize()
+        for bucket in self.buckets:
+            if bucket is not None:
+                for hash_code, key, value in bucket:
+                    yield (key, value)
+
+    def iter_keys(self):
+        """Return a generator of all keys in this hash table.
+           Best and worst case running time: O(n) to exhaust the generator,
+           O(1) extra space.
+        """
+        for key, value in self.iter_items():
+            yield key
+
+    def iter_values(self):
+        """Return a generator of all values in this hash table.
+           Best and worst case running time: O(n) to exhaust the generator,
+           O(1) extra space.
+        """
+        for key, value in self.iter_items():
+            yield value
+
     def keys(self):
         """Return a list of all keys in this hash table.
            Best and worst case running time: O(n) because the number of
@@ -39,11 +449,7 @@ class HashTable(object):
            of entries in the hash table.
         """
         # Collect all keys in each of the buckets
-        all_keys = []
-        for bucket in self.buckets:
-            for key, value in bucket.items():
-                all_keys.append(key)
-        return all_keys
+        return list(self.iter_keys())
 
     def values(self):
         """Return a list of all values in this hash table.
@@ -53,11 +459,7 @@ class HashTable(object):
            magnitude.
         """
         # Collect all values in each of the buckets
-        all_values = []
-        for bucket in self.buckets:
-            for key, value in bucket.items():
-                all_values.append(value)
-        return all_values
+        return list(self.iter_values())
 
     def items(self):
         """Return a list of all entries (key-value pairs) in this hash table.
@@ -69,10 +471,7 @@ class HashTable(object):
            hash table.
         """
         # Collect all pairs of key-value entries in each of the buckets
-        all_items = []
-        for bucket in self.buckets:
-            all_items.extend(bucket.items())
-        return all_items
+        return list(self.iter_items())
 
     def length(self):
         """Return the number of key-value entries by traversing its buckets.
@@ -91,11 +490,13 @@ class HashTable(object):
            is either the tail node or not in that list at all.
         """
         # Find the bucket the given key belongs in
-        index = self._bucket_index(key)
-        bucket = self.buckets[index]
+        hash_code = self.hasher(key)
+        bucket = self._bucket(hash_code)
         # Check if an entry with the given key exists in that bucket
-        entry = bucket.find(lambda key_value: key_value[0] == key)
-        return entry is not None  # True or False
+        node = self._find_node(bucket, hash_code, key)
+        if self.counters is not None:
+            self._record_lookup(bucket, node)
+        return node is not None  # True or False
 
     def get(self, key):
         """Return the value associated with the given key, or raise KeyError.
@@ -108,15 +509,15 @@ class HashTable(object):
            tail node or not in the list at all.
         """
         # Find the bucket the given key belongs in
-        index = self._bucket_index(key)
-        bucket = self.buckets[index]
+        hash_code = self.hasher(key)
+        bucket = self._bucket(hash_code)
         # Find the entry with the given key in that bucket, if one exists
-        entry = bucket.find(lambda key_value: key_value[0] == key)
-        if entry is not None:  # Found
+        node = self._find_node(bucket, hash_code, key)
+        if self.counters is not None:
+            self._record_lookup(bucket, node)
+        if node is not None:  # Found
             # Return the given key's associated value
-            assert isinstance(entry, tuple)
-            assert len(entry) == 2
-            return entry[1]
+            return node.data[2]
         else:  # Not found
             raise KeyError('Key not found: {}'.format(key))
 
@@ -132,25 +533,50 @@ class HashTable(object):
            method) present, or it is at the tail node in that bucket.
         """
         # Find the bucket the given key belongs in
-        index = self._bucket_index(key)
-        bucket = self.buckets[index]
-        # Find the entry with the given key in that bucket, if one exists
+        hash_code = self.hasher(key)
+        bucket = self._bucket(hash_code)
         # Check if an entry with the given key exists in that bucket
-        entry = bucket.find(lambda key_value: key_value[0] == key)
-        if entry is not None:  # Found
-            # In this case, the given key's value is being updated
-            # Remove the old key-value entry from the bucket first
-            bucket.delete(entry)
-        else:
-            # increment the size because we are adding a new key value pair
-            self.size += 1
-        # Insert the new key-value entry into the bucket in either case
-        bucket.append((key, value))
-        # Check if the load factor exceeds a threshold such as 0.75
-        if self.load_factor() > 0.75:
+        node = self._find_node(bucket, hash_code, key)
+        if node is not None:  # Found
+            # In this case, the given key's value is being updated in place
+            node.data = (hash_code, key, value)
+            return None
+        # Insert the new entry, and increment the size for it
+        if self.counters is not None:
+            self.counters.record_insert(bucket is not None and
+                                        not bucket.is_empty())
+        self._append_entry((hash_code, key, value))
+        self.size += 1
+        # Check if the load factor exceeds the policy's threshold
+        if self.policy.should_grow(self.size, len(self.buckets)):
             # If so, automatically resize to reduce the load factor
             self._resize()
 
+    def get_many(self, keys):
+        """Return a list of the values associated with the given keys, in the
+           same order, or raise KeyError if any of them is not found.
+
+           Average running time: O(k) for k keys, one get for each.
+
+        """
+        return [self.get(key) for key in keys]
+
+    def set_many(self, items):
+        """Insert or update each of the given key-value pairs.
+
+           Average running time: O(k) for k pairs. If we can count the pairs
+           up front, we resize at most once, to make room for all of them,
+           rather than double the buckets again and again along the way.
+
+        """
+        if not hasattr(items, '__len__'):
+            items = list(items)
+        needed = self.policy.buckets_needed(self.length() + len(items))
+        if needed > self._num_buckets():
+            self._resize(needed)
+        for key, value in items:
+            self.set(key, value)
+
     def delete(self, key):
         """Delete the given key and its associated value, or raise KeyError.
            Best case running time: O(1) if we are deleting an entry that is the
@@ -160,180 +586,1849 @@ class HashTable(object):
            any of the nodes of that bucket.
         """
         # Find the bucket the given key belongs in
-        index = self._bucket_index(key)
-        bucket = self.buckets[index]
+        hash_code = self.hasher(key)
+        bucket = self._bucket(hash_code)
         # Find the entry with the given key in that bucket, if one exists
-        entry = bucket.find(lambda key_value: key_value[0] == key)
-        if entry is not None:  # Found
-            # Remove the key-value entry from the bucket
-            bucket.delete(entry)
+        previous, node = self._find_previous(bucket, hash_code, key)
+        if self.counters is not None:
+            self._record_lookup(bucket, node)
+        if node is not None:  # Found
+            # Unlink the entry's node from the bucket
+            self._unlink(bucket, previous, node)
             self.size -= 1
+            self._shrink_if_sparse()
         else:  # Not found
             raise KeyError('Key not found: {}'.format(key))
 
+    def _shrink_if_sparse(self):
+        """Shrink this hash table, if its load factor has fallen below the
+           policy's threshold after a deletion, to give memory back.
+        """
+        num_buckets = self._num_buckets()
+        if self.policy.should_shrink(self.size, num_buckets):
+            self._resize(self.policy.shrunk_size(num_buckets))
+
+    def stats(self):
+        """Return a dictionary describing the shape of this hash table: its
+           size, number of buckets, load factor, and a histogram of how many
+           buckets hold each number of entries. If it tracks stats, this
+           also includes the counters of its TableStats.
+
+           Best and worst case running time: O(b + n) for b buckets.
+
+        """
+        report = {
+            'size': self.length(),
+            'buckets': self._num_buckets(),
+            'load_factor': self.load_factor(),
+        }
+        report.update(self._shape_stats())
+        if self.counters is not None:
+            report.update(self.counters.report())
+        return report
+
+    def _shape_stats(self):
+        """Return a dictionary with the histogram of chain lengths."""
+        chain_lengths = {}
+        for bucket in self._all_buckets():
+            length = sum(1 for entry in bucket)
+            chain_lengths[length] = chain_lengths.get(length, 0) + 1
+        # Buckets never created hold no entries either
+        uncreated = sum(1 for bucket in self.buckets if bucket is None)
+        if uncreated:
+            chain_lengths[0] = chain_lengths.get(0, 0) + uncreated
+        return {'chain_lengths': dict(sorted(chain_lengths.items()))}
+
+    def memory_usage(self):
+        """Return the number of bytes used by this hash table's structure,
+           not counting the key and value objects themselves.
+
+           Best and worst case running time: O(n), since we visit the linked
+           list, node and entry tuple that make up every entry.
+
+        """
+        total = _object_size(self) + sys.getsizeof(self.buckets)
+        if self.old_buckets is not None:
+            total += sys.getsizeof(self.old_buckets)
+        for bucket in self._all_buckets():
+            total += _object_size(bucket)
+            node = bucket.head
+            while node is not None:
+                total += _object_size(node) + sys.getsizeof(node.data)
+                node = node.next
+        return total
+
     def _resize(self, new_size=None):
-        """Resize this hash table's buckets and rehash all key-value entries.
-           Should be called automatically when load factor exceeds a threshold
-           such as 0.75 after an insertion (when set is called with a new key).
-           Best and worst case running time: O(n)
-           The longest running portion of this method's implementation is the
-           for loop at the bottom, which needs to iterate over all pre-existing
-           entries in our hash table for the process of rehashing. This step
-           will always require n iterations, and therefore will scale in direct
-           proportion to the growth of the number of entries in the hash table.
-           Best and worst case space usage: O(n), because most of the memory is
-           used by the key_value_pairs array, which scales at a linear
-           magnitude with respect to the growth of the number of entries.
-        """
-        # If unspecified, choose new size dynamically based on current size
+        """Resize this hash table's buckets and start rehashing all key-value
+           entries into them. Should be called automatically when the load
+           factor crosses one of the policy's thresholds, after an insertion
+           (when set is called with a new key) or a deletion.
+
+           Rather than rehash every entry at once, the current buckets are
+           kept aside as old_buckets, and each later operation moves a few of
+           them over (see _bucket), like the incremental rehashing in Redis.
+
+           Best and worst case running time: O(b) for b new buckets, but only
+           to allocate one list of b references to None, with no LinkedList
+           made for any of them until its first entry arrives. If a previous
+           resize is still in progress, it has to be finished first, which is
+           O(n). The policy's hysteresis makes this rare, since it takes many
+           inserts or deletes after one resize to trigger the next.
+
+           Best and worst case space usage: O(b), for the list of buckets.
+        """
+        if self.counters is not None:
+            self.counters.resizes += 1
+            start = time.perf_counter()
+        # Finish moving over the entries of any resize still in progress
+        self._finish_resize()
+        # If unspecified, grow by the policy's factor
         if new_size is None:
-            new_size = len(self.buckets) * 2  # Double size
-        # Option to reduce size if load factor is low
-        elif new_size is 0:
-            new_size = len(self.buckets) / 2  # Half size
-        # Get a list to temporarily hold all current key-value entries
-        key_value_pairs = self.items()
-        # Create a new list of new_size total empty linked list buckets
-        self.buckets = [LinkedList() for i in range(new_size)]
-        # reset size
-        self.size = 0
-        # Rehash each key-value entry into the new list of buckets,
-        for key, value in key_value_pairs:
-            self.set(key, value)
+            new_size = self.policy.grown_size(len(self.buckets))
+        # Keep the current buckets aside, to move over a few at a time
+        self.old_buckets = self.buckets
+        self.rehash_index = 0
+        # Create a new list of new_size (rounded up to a power of two) total
+        # buckets, each made into a linked list by its first entry
+        new_size = _next_power_of_two(new_size)
+        self.buckets = [None] * new_size
+        # Small tables are moved over entirely by this first step
+        self._rehash_step()
+        if self.counters is not None:
+            self.counters.resize_seconds += time.perf_counter() - start
 
 
-class HashTableProbing(HashTable):
-    '''A hash table that resolves collisions without chaining.'''
-    def __init__(self, init_size=8):
-        """Initialize this hash table with the given initial size."""
-        self.buckets = [None for i in range(init_size)]
-        self.size = 0  # Number of key-value entries
+class ConcurrentHashTable(HashTable):
+    '''A separate chaining hash table that is safe to share between threads.
+
+       The buckets are split into stripes, each guarded by its own lock, so
+       that operations on keys in different stripes run at the same time.
+       A resize is the only operation that takes every lock.
+    '''
+    def __init__(self, init_size=16, num_stripes=16, policy=None,
+                 hasher=None):
+        """Initialize this hash table with the given initial size, number of
+           lock stripes, ResizePolicy and hasher.
+
+           Both numbers are rounded up to powers of two, and there are never
+           fewer buckets than stripes, so bucket i is always guarded by lock
+           i % num_stripes, and a key stays in the same stripe when the
+           buckets are resized.
+
+        """
+        num_stripes = _next_power_of_two(num_stripes)
+        self.locks = [threading.Lock() for i in range(num_stripes)]
+        # Number of entries in each stripe, updated under that stripe's lock
+        self.counts = [0 for i in range(num_stripes)]
+        num_buckets = _next_power_of_two(max(init_size, num_stripes))
+        self.buckets = [LinkedList() for i in range(num_buckets)]
+        self.old_buckets = None  # This table always resizes all at once
+        self.rehash_index = 0
+        self.policy = self.DEFAULT_POLICY if policy is None else policy
+        self.hasher = hash if hasher is None else hasher
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'ConcurrentHashTable({!r})'.format(self.items())
+
+    @property
+    def size(self):
+        """The number of key-value entries, totalled over all the stripes.
+           While other threads are writing, this is only a snapshot.
+        """
+        return sum(self.counts)
+
+    def _lock_bucket(self, hash_code):
+        """Acquire the lock for the bucket a key with the given hash code
+           belongs in, and return the stripe index and the bucket.
+
+           If a resize swaps in new buckets while we wait for the lock, we
+           release it and look up the key's bucket again.
+
+        """
+        while True:
+            buckets = self.buckets
+            index = hash_code & (len(buckets) - 1)
+            stripe = index & (len(self.locks) - 1)
+            self.locks[stripe].acquire()
+            if buckets is self.buckets:
+                return stripe, buckets[index]
+            self.locks[stripe].release()
+
+    def _lock_all(self):
+        """Acquire every stripe's lock, always in the same order, so that two
+           threads doing so cannot deadlock.
+        """
+        for lock in self.locks:
+            lock.acquire()
+
+    def _unlock_all(self):
+        """Release every stripe's lock."""
+        for lock in reversed(self.locks):
+            lock.release()
+
+    def iter_items(self):
+        """Return a generator of all entries (key-value pairs) in this hash
+           table. Only one stripe's lock is held at a time, while copying the
+           entries of one bucket, so writers are never blocked for long. The
+           entries come from the buckets current when the generator started,
+           and may or may not include changes made since then.
+
+           Best and worst case running time: O(n) to exhaust the generator.
+
+        """
+        buckets = self.buckets
+        for index, bucket in enumerate(buckets):
+            lock = self.locks[index & (len(self.locks) - 1)]
+            with lock:
+                entries = bucket.items()
+            for hash_code, key, value in entries:
+                yield (key, value)
 
     def keys(self):
         """Return a list of all keys in this hash table.
 
-           Best and worst case running time: O(n) because the number of
-           iterations through the for loop scales with the growth of the number
-           of entries in the hash table.
+           Best and worst case running time: O(n), while holding every lock.
 
         """
-        # Collect all keys in each of the buckets
-        all_keys = []
-        for entry in self.buckets:
-            if entry is not None:
-                all_keys.append(entry[0])
-        return all_keys
+        return [key for key, value in self.items()]
 
     def values(self):
         """Return a list of all values in this hash table.
 
-           Best and worst case running time: O(n), because the number of
-           iterations needed to collect the values will grow in proportion to
-           the growth of number of entries in the hash table, at a linear
-           magnitude.
+           Best and worst case running time: O(n), while holding every lock.
 
         """
-        # Collect all values in each of the buckets
-        all_values = []
-        for entry in self.buckets:
-            if entry is not None:
-                all_values.append(entry[1])
-        return all_values
+        return [value for key, value in self.items()]
 
     def items(self):
-        """Return a list of all entries (key-value pairs) in this hash table.
+        """Return a list of all entries (key-value pairs) in this hash table,
+           all as of the same moment.
 
-           Best and worst case running time: O(n) because on each of b
-           iterations through the for loop, we require l iterations (the load
-           factor, or the average number of entries we can expect to be in each
-           bucket), which equal n iterations. This method will therefore scale
-           in linear proportion to the size of the number of entries in the
-           hash table.
+           Best and worst case running time: O(n), while holding every lock.
 
         """
-        # Collect all pairs of key-value entries in each of the buckets
-        all_items = []
-        for i in range(len(self.buckets)):
-            if self.buckets[i] is not None:
-                all_items.append(self.buckets[i])
-        return all_items
+        self._lock_all()
+        try:
+            return list(HashTable.iter_items(self))
+        finally:
+            self._unlock_all()
 
     def contains(self, key):
         """Return True if this hash table contains the given key, or False.
 
-           Best case running time: O(1) if we find the entry at the index
-           determined by the hash algorithm.
+           Average running time: O(1), holding only the key's stripe lock.
 
-           Worst case running time: O(n), where n is the number of items in
-           the hash table.
+        """
+        hash_code = self.hasher(key)
+        stripe, bucket = self._lock_bucket(hash_code)
+        try:
+            return self._find_node(bucket, hash_code, key) is not None
+        finally:
+            self.locks[stripe].release()
+
+    def get(self, key):
+        """Return the value associated with the given key, or raise KeyError.
+
+           Average running time: O(1), holding only the key's stripe lock.
+
+        """
+        hash_code = self.hasher(key)
+        stripe, bucket = self._lock_bucket(hash_code)
+        try:
+            node = self._find_node(bucket, hash_code, key)
+        finally:
+            self.locks[stripe].release()
+        if node is None:
+            raise KeyError('Key not found: {}'.format(key))
+        return node.data[2]
+
+    def set(self, key, value):
+        """Insert or update the given key with its associated value.
+
+           Average running time: O(1), holding only the key's stripe lock.
+           If the insertion pushes the load factor over the policy's
+           threshold, the resize that follows takes every lock, and is O(n).
+
+        """
+        hash_code = self.hasher(key)
+        stripe, bucket = self._lock_bucket(hash_code)
+        try:
+            node = self._find_node(bucket, hash_code, key)
+            if node is not None:
+                node.data = (hash_code, key, value)
+                return None
+            bucket.append((hash_code, key, value))
+            self.counts[stripe] += 1
+        finally:
+            self.locks[stripe].release()
+        if self.policy.should_grow(self.size, len(self.buckets)):
+            self._resize()
+
+    def delete(self, key):
+        """Delete the given key and its associated value, or raise KeyError.
+
+           Average running time: O(1), holding only the key's stripe lock,
+           unless the deletion makes the table sparse enough to shrink.
+
+        """
+        hash_code = self.hasher(key)
+        stripe, bucket = self._lock_bucket(hash_code)
+        try:
+            previous, node = self._find_previous(bucket, hash_code, key)
+            if node is None:
+                raise KeyError('Key not found: {}'.format(key))
+            self._unlink(bucket, previous, node)
+            self.counts[stripe] -= 1
+        finally:
+            self.locks[stripe].release()
+        if self._is_sparse():
+            self._shrink_if_sparse()
+
+    def _shrink_if_sparse(self):
+        """Shrink this hash table, if it is still sparse enough once we hold
+           every lock, since another thread may have shrunk it already.
+        """
+        self._lock_all()
+        try:
+            if self._is_sparse():
+                self._rehash(self.policy.shrunk_size(len(self.buckets)))
+        finally:
+            self._unlock_all()
+
+    def _is_sparse(self):
+        """Return True if the policy would shrink this hash table, and it
+           has more buckets than stripes, the fewest it is ever rehashed to.
+        """
+        num_buckets = len(self.buckets)
+        return (num_buckets > len(self.locks) and
+                self.policy.should_shrink(self.size, num_buckets))
+
+    def _resize(self, new_size=None):
+        """Resize this hash table's buckets and rehash all key-value entries,
+           while holding every lock. If no size is given, we only grow if the
+           table is still over the threshold once we hold the locks, since
+           several threads may have asked to grow it at the same time.
+
+           Best and worst case running time: O(n)
 
         """
-        # if entry is inside, it is either at the hashed index, or right of it
-        for i in range(len(self.buckets)):
-            entry = self.buckets[i]
-            if entry is not None and entry[0] == key:
+        self._lock_all()
+        try:
+            if new_size is None:
+                num_buckets = len(self.buckets)
+                if not self.policy.should_grow(self.size, num_buckets):
+                    return None
+                new_size = self.policy.grown_size(num_buckets)
+            self._rehash(new_size)
+        finally:
+            self._unlock_all()
+
+    def _rehash(self, new_size):
+        """Move every entry into a new list of at least new_size buckets.
+           The caller must hold every lock.
+        """
+        num_buckets = _next_power_of_two(max(new_size, len(self.locks)))
+        new_buckets = [LinkedList() for i in range(num_buckets)]
+        for bucket in self.buckets:
+            for entry in bucket:
+                new_buckets[entry[0] & (num_buckets - 1)].append(entry)
+        # Readers waiting on a lock notice the swap, and look again
+        self.buckets = new_buckets
+
+
+class SnapshotHashTable(HashTable):
+    '''A separate chaining hash table for workloads with far more reads than
+       writes, where readers never wait for a lock.
+
+       The buckets are a tuple of tuples of (hash code, key, value) entries,
+       which are never changed once published. A reader takes whatever
+       buckets are current with a single attribute lookup, and works on that
+       snapshot. A writer copies the buckets (under a lock shared only with
+       other writers), changes the copy, and then publishes it in place of
+       the current buckets with a single assignment.
+
+       Each publish copies the list of b buckets, so a single set or delete
+       costs O(b). Writers with more than a few changes to make must batch
+       them into one set_many call, which pays for that copy only once.
+    '''
+    def __init__(self, init_size=8, policy=None, hasher=None):
+        """Initialize this hash table with the given initial size (rounded up
+           to a power of two), ResizePolicy and hasher.
+        """
+        self.buckets = tuple(() for i in range(_next_power_of_two(init_size)))
+        self.size = 0  # Number of key-value entries
+        self.version = 0  # Number of times new buckets were published
+        self.old_buckets = None  # This table always resizes all at once
+        self.rehash_index = 0
+        self.policy = self.DEFAULT_POLICY if policy is None else policy
+        self.hasher = hash if hasher is None else hasher
+        self.write_lock = threading.Lock()
+
+    @classmethod
+    def from_items(cls, items, expected_size=None, policy=None,
+                   hasher=None):
+        """Return a new hash table holding the given key-value pairs, with
+           enough buckets for expected_size entries (by default, the number
+           of items given), published all at once.
+
+           Best and worst case running time: O(n), since we load through
+           set_many, rather than copy the buckets again for each pair.
+
+        """
+        if expected_size is None:
+            items = list(items)
+            expected_size = len(items)
+        if policy is None:
+            policy = cls.DEFAULT_POLICY
+        init_size = max(8, policy.buckets_needed(expected_size))
+        table = cls(init_size, policy=policy, hasher=hasher)
+        table.set_many(items)
+        return table
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'SnapshotHashTable({!r})'.format(self.items())
+
+    def iter_items(self):
+        """Return a generator of all entries in one snapshot of this hash
+           table. Unlike the other tables, this one may be changed while the
+           generator is in use, since it keeps working on the same snapshot.
+
+           Best and worst case running time: O(n), without blocking.
+
+        """
+        buckets = self.buckets
+        for bucket in buckets:
+            for hash_code, key, value in bucket:
+                yield (key, value)
+
+    def contains(self, key):
+        """Return True if this hash table contains the given key, or False.
+
+           Average running time: O(1), without blocking.
+
+        """
+        hash_code = self.hasher(key)
+        buckets = self.buckets
+        for entry in buckets[hash_code & (len(buckets) - 1)]:
+            if entry[0] == hash_code and entry[1] == key:
                 return True
         return False
 
     def get(self, key):
         """Return the value associated with the given key, or raise KeyError.
 
-           Best case running time: O(1), because we may need only one iteration
-           in the execution of the find method if the key we are looking for is
-           located at the head node.
-
-           Worst case running time: O(n), if the bucket we are looking for the
-           entry in contains all the key value pairs, and we need to iterate
-           through the whole list. This may happen if the item is either the
-           tail node or not in the list at all.
+           Average running time: O(1), without blocking, even while a writer
+           is resizing, since the writer only replaces the buckets once it
+           has finished.
 
         """
-        for entry in self.buckets:
-            if entry is not None and entry[0] == key:
-                return entry[1]
+        hash_code = self.hasher(key)
+        buckets = self.buckets
+        for entry in buckets[hash_code & (len(buckets) - 1)]:
+            if entry[0] == hash_code and entry[1] == key:
+                return entry[2]
         raise KeyError('Key not found: {}'.format(key))
 
     def set(self, key, value):
         """Insert or update the given key with its associated value.
 
-           Best case running time: O(1) if there is a NoneType object existing
-           at the index in the buckets array decided by the hashing algorithm.
+           Running time: O(b) for b buckets, since we copy the list of
+           buckets (though not the entries in them) to publish a new one.
+           To write many pairs, call set_many once instead, which is O(b + k)
+           rather than O(b * k) for k pairs.
+
+        """
+        self.set_many([(key, value)])
+
+    def set_many(self, items):
+        """Insert or update each of the given key-value pairs, and publish
+           them all at once.
 
-           Worst case running time: O(n) when we are performing an update, and
-           the entry is at the last index in the hash buckets array.
+           Running time: O(b + k) for b buckets and k pairs, so a batch of
+           writes only pays for copying the buckets once.
 
         """
-        # Find the bucket the given key belongs in
-        index = self._bucket_index(key)
-        # place the entry in the index, if no previous entry
-        if self.buckets[index] is None:
-            self.buckets[index] = (key, value)
-            self.size += 1
-        # try to find a key with the same as the one being set, then update
-        elif self.contains(key) is True:
-            for i in range(len(self.buckets)):
-                entry = self.buckets[i]
-                if entry is not None and entry[0] == key:
-                    self.buckets[i] = (key, value)
-        # there is a previous entry with a different key, go find another index
-        else:
-            self.buckets.append((key, value))
-            self.size += 1
+        with self.write_lock:
+            buckets = list(self.buckets)
+            size = self.size
+            for key, value in items:
+                if self._set_entry(buckets, self.hasher(key), key, value):
+                    size += 1
+                    if self.policy.should_grow(size, len(buckets)):
+                        new_size = self.policy.grown_size(len(buckets))
+                        buckets = self._rehashed(buckets, new_size)
+            self._publish(buckets, size)
 
     def delete(self, key):
         """Delete the given key and its associated value, or raise KeyError.
 
-           Average running time: O(n) because we perform linear search to
-           discover if the key exists currently in the hash buckets array.
+           Running time: O(b) for b buckets, as with set, so deleting many
+           keys one at a time is O(b * k) for k keys.
 
         """
-        for i in range(len(self.buckets)):
-            entry = self.buckets[i]
-            if entry is not None and entry[0] == key:
-                self.buckets[i] = None
-                self.size -= 1
-                return None
-        raise KeyError('Key not found: {}'.format(key))
+        with self.write_lock:
+            hash_code = self.hasher(key)
+            buckets = list(self.buckets)
+            index = hash_code & (len(buckets) - 1)
+            bucket = buckets[index]
+            for i, entry in enumerate(bucket):
+                if entry[0] == hash_code and entry[1] == key:
+                    buckets[index] = bucket[:i] + bucket[i + 1:]
+                    break
+            else:
+                raise KeyError('Key not found: {}'.format(key))
+            size = self.size - 1
+            if self.policy.should_shrink(size, len(buckets)):
+                new_size = self.policy.shrunk_size(len(buckets))
+                buckets = self._rehashed(buckets, new_size)
+            self._publish(buckets, size)
+
+    def _set_entry(self, buckets, hash_code, key, value):
+        """Replace the bucket for the given key in the given list of buckets
+           with a copy holding the new entry. Return True if the key is new.
+        """
+        index = hash_code & (len(buckets) - 1)
+        bucket = buckets[index]
+        for i, entry in enumerate(bucket):
+            if entry[0] == hash_code and entry[1] == key:
+                buckets[index] = (bucket[:i] + ((hash_code, key, value),) +
+                                  bucket[i + 1:])
+                return False
+        buckets[index] = bucket + ((hash_code, key, value),)
+        return True
+
+    def _rehashed(self, buckets, new_size):
+        """Return a new list of new_size (rounded up to a power of two)
+           buckets holding the entries in the given buckets.
+        """
+        new_size = _next_power_of_two(new_size)
+        new_buckets = [[] for i in range(new_size)]
+        for bucket in buckets:
+            for entry in bucket:
+                new_buckets[entry[0] & (new_size - 1)].append(entry)
+        return [tuple(bucket) for bucket in new_buckets]
+
+    def _publish(self, buckets, size):
+        """Make the given list of buckets the current snapshot."""
+        self.buckets = tuple(buckets)
+        self.size = size
+        self.version += 1
+
+    def _resize(self, new_size=None):
+        """Publish a resized copy of this hash table's buckets.
+
+           Best and worst case running time: O(n), but readers keep using
+           the previous snapshot in the meantime.
+
+        """
+        with self.write_lock:
+            if new_size is None:
+                new_size = self.policy.grown_size(len(self.buckets))
+            self._publish(self._rehashed(self.buckets, new_size), self.size)
+
+    def memory_usage(self):
+        """Return the number of bytes used by this hash table's structure,
+           not counting the key and value objects themselves.
+
+           Best and worst case running time: O(n)
+
+        """
+        buckets = self.buckets
+        total = _object_size(self) + sys.getsizeof(buckets)
+        for bucket in buckets:
+            total += sys.getsizeof(bucket)
+            for entry in bucket:
+                total += sys.getsizeof(entry)
+        return total
+
+
+class HashTableProbing(HashTable):
+    '''A hash table that resolves collisions using open addressing.'''
+    # Strategies for stepping away from a key's home slot on a collision
+    PROBING_STRATEGIES = ('linear', 'quadratic', 'double')
+
+    def __init__(self, init_size=8, probing='linear', policy=None,
+                 hasher=None, track_stats=False):
+        """Initialize this hash table with the given initial size, the name
+           of the probing strategy used to resolve collisions, the
+           ResizePolicy that decides when it grows and shrinks, the hasher
+           for its keys, and whether it counts the work it does.
+
+           The number of slots is rounded up to a power of two, so that the
+           quadratic and double hashing probe sequences visit every slot.
+
+        """
+        if probing not in self.PROBING_STRATEGIES:
+            raise ValueError('Unknown probing strategy: {}'.format(probing))
+        self.probing = probing
+        self.buckets = [None for i in range(_next_power_of_two(init_size))]
+        self.size = 0  # Number of key-value entries
+        self.deleted = 0  # Number of tombstones left behind by delete
+        self.policy = self._checked_policy(policy)
+        self.hasher = hash if hasher is None else hasher
+        if track_stats:
+            self.counters = TableStats()
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'HashTableProbing({!r})'.format(self.items())
+
+    def _checked_policy(self, policy):
+        """Return the given ResizePolicy (or the default one), or raise
+           ValueError if it lets the slots fill up: with no free slot left,
+           a probe for a missing key would never end.
+        """
+        if policy is None:
+            policy = self.DEFAULT_POLICY
+        if policy.grow_at >= 1:
+            raise ValueError('grow_at must be below 1 for open addressing: '
+                             '{}'.format(policy.grow_at))
+        return policy
+
+    def _probe(self, hash_code, num_slots):
+        """Return a generator of the slot indices to visit for a key with the
+           given hash code, among the given power of two number of slots,
+           starting at its home slot, in the order of the probing strategy.
+
+           Running time: O(1) for each index generated. Every sequence visits
+           each slot exactly once before it repeats, because the number of
+           slots is a power of two (and the double hashing step is odd).
+
+        """
+        mask = num_slots - 1
+        index = hash_code & mask
+        if self.probing == 'double':
+            # the second hash picks an odd step, so it is coprime to the size
+            step = ((hash_code >> 16) ^ hash_code) | 1
+        else:
+            step = 1
+        for i in range(num_slots):
+            yield index
+            if self.probing == 'quadratic':
+                # triangular numbers: home + 1, + 3, + 6, + 10, ...
+                index = (index + i + 1) & mask
+            else:
+                index = (index + step) & mask
+
+    def _find_slot(self, key):
+        """Return the index of the slot that holds the given key, or None.
+
+           Average running time: O(1) while the load factor stays bounded,
+           because we stop at the first slot that has never been used.
+
+           Worst case running time: O(n), if every slot on the probe sequence
+           is occupied or a tombstone.
+
+        """
+        probes = 0
+        found = None
+        for index in self._probe(self.hasher(key), len(self.buckets)):
+            probes += 1
+            entry = self.buckets[index]
+            if entry is None:
+                # keys are never stored past a slot that was never used
+                break
+            if entry is not _DELETED and entry[0] == key:
+                found = index
+                break
+        if self.counters is not None:
+            self.counters.record_lookup(probes, found is not None)
+        return found
+
+    def load_factor(self):
+        """Return the ratio of used slots (live entries and tombstones) to the
+           total number of slots, since both lengthen the probe sequences.
+
+           Best and worst case running time: O(1)
+
+        """
+        return (self.size + self.deleted) / len(self.buckets)
+
+    def iter_items(self):
+        """Return a generator of all entries (key-value pairs) in this hash
+           table, skipping empty slots and tombstones.
+
+           Best and worst case running time: O(b) for b slots, which is kept
+           within a constant factor of the number of entries.
+
+        """
+        for entry in self.buckets:
+            if entry is not None and entry is not _DELETED:
+                yield entry
+
+    def contains(self, key):
+        """Return True if this hash table contains the given key, or False.
+
+           Average running time: O(1), because we start probing at the index
+           determined by the hash algorithm, and the resizing keeps the probe
+           sequences short.
+
+           Worst case running time: O(n), where n is the number of items in
+           the hash table.
+
+        """
+        return self._find_slot(key) is not None
+
+    def get(self, key):
+        """Return the value associated with the given key, or raise KeyError.
+
+           Average running time: O(1), because we only probe the slots along
+           the key's probe sequence, up to the first slot never used.
+
+           Worst case running time: O(n), if the probe sequence passes over
+           all the other entries in the hash table.
+
+        """
+        index = self._find_slot(key)
+        if index is None:
+            raise KeyError('Key not found: {}'.format(key))
+        return self.buckets[index][1]
+
+    def set(self, key, value):
+        """Insert or update the given key with its associated value.
+
+           Average running time: O(1), because the load factor is kept below
+           the policy's threshold, so we expect to probe only a few slots
+           before finding either the key or a free slot for it.
+
+           Worst case running time: O(n) when the insertion triggers a resize,
+           and all the entries are rehashed.
+
+        """
+        # Remember the first tombstone passed, so we can reuse its slot
+        free_index = None
+        hash_code = self.hasher(key)
+        for index in self._probe(hash_code, len(self.buckets)):
+            entry = self.buckets[index]
+            if entry is None:
+                if free_index is None:
+                    free_index = index
+                break
+            if entry is _DELETED:
+                if free_index is None:
+                    free_index = index
+            elif entry[0] == key:
+                # the key is already present, so update its value
+                self.buckets[index] = (key, value)
+                return None
+        # the key is new, so place the entry in the first free slot found
+        if self.counters is not None:
+            home = hash_code & (len(self.buckets) - 1)
+            self.counters.record_insert(free_index != home)
+        if self.buckets[free_index] is _DELETED:
+            self.deleted -= 1
+        self.buckets[free_index] = (key, value)
+        self.size += 1
+        # Check if the load factor exceeds the policy's threshold
+        if self.policy.should_grow(self.size + self.deleted,
+                                   len(self.buckets)):
+            self._resize()
+
+    def delete(self, key):
+        """Delete the given key and its associated value, or raise KeyError.
+
+           Average running time: O(1), because we only probe the slots along
+           the key's probe sequence. The entry is replaced by a tombstone, so
+           the probe sequences of other keys that pass over it still work.
+
+        """
+        index = self._find_slot(key)
+        if index is None:
+            raise KeyError('Key not found: {}'.format(key))
+        self.buckets[index] = _DELETED
+        self.size -= 1
+        self.deleted += 1
+        self._shrink_if_sparse()
+
+    def _shrink_if_sparse(self):
+        """Shrink this hash table, if its load factor has fallen below the
+           policy's threshold after a deletion. Otherwise, if tombstones fill
+           more of its slots than the policy allows, rehash it without them,
+           since every miss has to probe past them.
+        """
+        num_slots = self._num_buckets()
+        if self.policy.should_shrink(self.size, num_slots):
+            self._resize(self.policy.shrunk_size(num_slots))
+        elif self.policy.should_compact(self.deleted, num_slots):
+            self._resize()
+
+    def _resize(self, new_size=None):
+        """Resize this hash table's slots and rehash all key-value entries,
+           dropping any tombstones along the way.
+
+           Best and worst case running time: O(n), since every entry has to be
+           placed again along its probe sequence in the new list of slots.
+
+        """
+        # If unspecified, grow only if the live entries need the room, that
+        # is, if they would fill more of the slots than just after a grow
+        if new_size is None:
+            new_size = len(self.buckets)
+            if self.size / new_size > self.policy.grow_at / self.policy.factor:
+                new_size = self.policy.grown_size(new_size)
+        # Entries moved over are not counted as new inserts
+        counters, self.counters = self.counters, None
+        if counters is not None:
+            counters.resizes += 1
+            start = time.perf_counter()
+        old_slots = self.buckets
+        self.buckets = [None for i in range(_next_power_of_two(new_size))]
+        self.size = 0
+        self.deleted = 0
+        try:
+            for entry in old_slots:
+                if entry is not None and entry is not _DELETED:
+                    self.set(entry[0], entry[1])
+        finally:
+            self.counters = counters
+        if counters is not None:
+            counters.resize_seconds += time.perf_counter() - start
+
+    def _shape_stats(self):
+        """Return a dictionary with the number of tombstones."""
+        return {'tombstones': self.deleted}
+
+    def memory_usage(self):
+        """Return the number of bytes used by this hash table's structure,
+           not counting the key and value objects themselves.
+
+           Best and worst case running time: O(b) for b slots, since we count
+           the entry tuple in every used slot.
+
+        """
+        total = _object_size(self) + sys.getsizeof(self.buckets)
+        for entry in self.buckets:
+            if entry is not None and entry is not _DELETED:
+                total += sys.getsizeof(entry)
+        return total
+
+
+class RobinHoodHashTable(HashTableProbing):
+    '''A hash table that resolves collisions using Robin Hood hashing.'''
+    # Even probe distances let this table fill up further before growing
+    DEFAULT_POLICY = ResizePolicy(grow_at=0.9)
+
+    def __init__(self, init_size=8, policy=None, hasher=None):
+        """Initialize this hash table with the given initial size, the
+           ResizePolicy that decides when it grows and shrinks, and the
+           hasher for its keys.
+
+           Along with each slot we track the probe distance of its entry, the
+           number of slots it sits past its home slot (or -1 if empty).
+
+        """
+        self.policy = self._checked_policy(policy)
+        self.hasher = hash if hasher is None else hasher
+        self.buckets = [None for i in range(_next_power_of_two(init_size))]
+        self.distances = [-1 for i in range(len(self.buckets))]
+        self.size = 0  # Number of key-value entries
+        self.deleted = 0  # Always 0, since deletion shifts entries back
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'RobinHoodHashTable({!r})'.format(self.items())
+
+    def _find_slot(self, key):
+        """Return the index of the slot that holds the given key, or None.
+
+           Average running time: O(1), and the search ends early once we
+           reach an entry closer to its home slot than the key would be, since
+           an insertion of the key would have displaced that entry.
+
+        """
+        mask = len(self.buckets) - 1
+        index = self.hasher(key) & mask
+        distance = 0
+        while distance <= self.distances[index]:
+            if self.buckets[index][0] == key:
+                return index
+            index = (index + 1) & mask
+            distance += 1
+        return None
+
+    def max_probe_distance(self):
+        """Return the longest probe distance of any entry in this table.
+
+           Best and worst case running time: O(b) for b slots.
+
+        """
+        return max(self.distances)
+
+    def mean_probe_distance(self):
+        """Return the average probe distance of the entries in this table.
+
+           Best and worst case running time: O(b) for b slots.
+
+        """
+        if self.size == 0:
+            return 0
+        total = sum(distance for distance in self.distances if distance > 0)
+        return total / self.size
+
+    def set(self, key, value):
+        """Insert or update the given key with its associated value.
+
+           Average running time: O(1). Whenever the entry being placed is
+           further from its home slot than the entry in the current slot, the
+           two trade places, and we carry on placing the evicted entry. This
+           takes from the "rich" entries near their home slot, and gives to
+           the "poor" ones far from it, so the probe distances stay even.
+
+        """
+        mask = len(self.buckets) - 1
+        index = self.hasher(key) & mask
+        entry = (key, value)
+        distance = 0
+        # Until we displace an entry, the key may still be found further on
+        searching = True
+        while self.distances[index] != -1:
+            if searching and self.buckets[index][0] == key:
+                self.buckets[index] = entry
+                return None
+            if self.distances[index] < distance:
+                # Swap the entry being placed with the richer one here
+                entry, self.buckets[index] = self.buckets[index], entry
+                distance, self.distances[index] = (self.distances[index],
+                                                   distance)
+                searching = False
+            index = (index + 1) & mask
+            distance += 1
+        self.buckets[index] = entry
+        self.distances[index] = distance
+        self.size += 1
+        # Check if the load factor exceeds the policy's threshold
+        if self.policy.should_grow(self.size, len(self.buckets)):
+            self._resize()
+
+    def delete(self, key):
+        """Delete the given key and its associated value, or raise KeyError.
+
+           Average running time: O(1). Rather than leave a tombstone, we shift
+           each following entry back by one slot until we reach an empty slot
+           or an entry already at its home slot.
+
+        """
+        index = self._find_slot(key)
+        if index is None:
+            raise KeyError('Key not found: {}'.format(key))
+        mask = len(self.buckets) - 1
+        next_index = (index + 1) & mask
+        while self.distances[next_index] > 0:
+            self.buckets[index] = self.buckets[next_index]
+            self.distances[index] = self.distances[next_index] - 1
+            index = next_index
+            next_index = (index + 1) & mask
+        self.buckets[index] = None
+        self.distances[index] = -1
+        self.size -= 1
+        self._shrink_if_sparse()
+
+    def _resize(self, new_size=None):
+        """Resize this hash table's slots and rehash all key-value entries.
+
+           Best and worst case running time: O(n)
+
+        """
+        if new_size is None:
+            new_size = self.policy.grown_size(len(self.buckets))
+        old_slots = self.buckets
+        self.buckets = [None for i in range(_next_power_of_two(new_size))]
+        self.distances = [-1 for i in range(len(self.buckets))]
+        self.size = 0
+        for entry in old_slots:
+            if entry is not None:
+                self.set(entry[0], entry[1])
+
+    def memory_usage(self):
+        """Return the number of bytes used by this hash table's structure,
+           not counting the key and value objects themselves.
+
+           Best and worst case running time: O(b) for b slots.
+
+        """
+        return (HashTableProbing.memory_usage(self) +
+                sys.getsizeof(self.distances))
+
+
+class CuckooHashTable(HashTableProbing):
+    '''A hash table that resolves collisions using cuckoo hashing: each key
+       may only sit in one of a few slots, one per hash function, so every
+       lookup probes at most that many slots.
+    '''
+    # With two hash functions, inserts start failing past half full; with
+    # more of them, a policy with a higher grow_at (up to 0.9) works well
+    DEFAULT_POLICY = ResizePolicy(grow_at=0.5)
+    # Odd multipliers for the hash functions, each mixing the key's hash
+    # code into a different slot index
+    MULTIPLIERS = (0x9e3779b97f4a7c15, 0xc2b2ae3d27d4eb4f,
+                   0x165667b19e3779f9, 0xd6e8feb86659fd93)
+    # Longest chain of evictions an insert may cause before we rehash
+    MAX_EVICTIONS = 32
+
+    def __init__(self, init_size=8, num_hashes=2, policy=None, hasher=None,
+                 seed=None):
+        """Initialize this hash table with the given initial size, number of
+           hash functions (from 2 to 4), ResizePolicy that decides when it
+           grows and shrinks, hasher for its keys, and seed for the random
+           hash functions picked when it rehashes after a failed insert.
+
+           Along with each slot we keep the hash code of its entry, so an
+           evicted entry can find its other slots without hashing its key.
+
+        """
+        if not 2 <= num_hashes <= len(self.MULTIPLIERS):
+            raise ValueError('Number of hash functions must be from 2 to '
+                             '{}: {}'.format(len(self.MULTIPLIERS),
+                                             num_hashes))
+        self.policy = self._checked_policy(policy)
+        self.hasher = hash if hasher is None else hasher
+        self.multipliers = self.MULTIPLIERS[:num_hashes]
+        self.random = random.Random(seed)
+        self.buckets = [None for i in range(_next_power_of_two(init_size))]
+        self.hash_codes = [None for i in range(len(self.buckets))]
+        # Entries that found no slot even after a rehash, which only happens
+        # when more keys share the same hash code than there are functions
+        self.stash = []
+        self.size = 0  # Number of key-value entries
+        self.deleted = 0  # Always 0, since deletion empties the slot
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'CuckooHashTable({!r})'.format(self.items())
+
+    def _slots(self, hash_code):
+        """Return the indices of the slots that may hold an entry with the
+           given hash code, one for each hash function.
+
+           Best and worst case running time: O(1) for a fixed number of hash
+           functions. Multiplying by an odd number spreads the hash code into
+           the top bits, which pick the slot.
+
+        """
+        shift = 65 - len(self.buckets).bit_length()
+        hash_code &= _MASK_64
+        return [(((hash_code ^ multiplier) * multiplier) & _MASK_64) >> shift
+                for multiplier in self.multipliers]
+
+    def _find_slot(self, key):
+        """Return the index of the slot that holds the given key, or None.
+
+           Worst case running time: O(1), because only the slots for the
+           key's hash functions are probed, whatever the load factor.
+
+        """
+        hash_code = self.hasher(key)
+        for index in self._slots(hash_code):
+            if (self.hash_codes[index] == hash_code and
+                    self.buckets[index][0] == key):
+                return index
+        return None
+
+    def _find_in_stash(self, key):
+        """Return the position in the stash of the given key, or None.
+
+           Running time: O(s) for s stashed entries, which is almost always 0.
+
+        """
+        for position, entry in enumerate(self.stash):
+            if entry[1][0] == key:
+                return position
+        return None
+
+    def iter_items(self):
+        """Return a generator of all entries (key-value pairs) in this hash
+           table.
+
+           Best and worst case running time: O(b) for b slots.
+
+        """
+        for entry in self.buckets:
+            if entry is not None:
+                yield entry
+        for hash_code, entry in self.stash:
+            yield entry
+
+    def contains(self, key):
+        """Return True if this hash table contains the given key, or False.
+
+           Worst case running time: O(1), at most one probe per hash
+           function (while the stash is empty).
+
+        """
+        return (self._find_slot(key) is not None or
+                self._find_in_stash(key) is not None)
+
+    def get(self, key):
+        """Return the value associated with the given key, or raise KeyError.
+
+           Worst case running time: O(1), at most one probe per hash
+           function (while the stash is empty).
+
+        """
+        index = self._find_slot(key)
+        if index is not None:
+            return self.buckets[index][1]
+        position = self._find_in_stash(key)
+        if position is not None:
+            return self.stash[position][1][1]
+        raise KeyError('Key not found: {}'.format(key))
+
+    def _place(self, hash_code, entry):
+        """Place the given entry with the given hash code in one of its slots,
+           evicting the entry there to one of its other slots if they are all
+           taken, and so on. Return None if every entry found a slot, or the
+           (hash code, entry) pair left over after MAX_EVICTIONS, when the
+           evictions are likely going around a cycle.
+
+           Average running time: O(1) while the load factor stays below the
+           policy's threshold. Worst case running time: O(MAX_EVICTIONS).
+
+        """
+        previous = None
+        for eviction in range(self.MAX_EVICTIONS):
+            slots = self._slots(hash_code)
+            for index in slots:
+                if self.buckets[index] is None:
+                    self.buckets[index] = entry
+                    self.hash_codes[index] = hash_code
+                    return None
+            # Evict from a slot other than the one we were just evicted from,
+            # so two entries do not keep trading the same slot
+            choices = [index for index in slots if index != previous]
+            if not choices:
+                break  # Every hash function picks the same slot
+            index = choices[eviction % len(choices)]
+            entry, self.buckets[index] = self.buckets[index], entry
+            hash_code, self.hash_codes[index] = (self.hash_codes[index],
+                                                 hash_code)
+            previous = index
+        return hash_code, entry
+
+    def set(self, key, value):
+        """Insert or update the given key with its associated value.
+
+           Average running time: O(1). A new entry may evict a chain of other
+           entries to their other slots; if that chain grows too long, the
+           table is rehashed with new hash functions, which takes O(n) but
+           happens with low probability below the load threshold.
+
+        """
+        hash_code = self.hasher(key)
+        for index in self._slots(hash_code):
+            if (self.hash_codes[index] == hash_code and
+                    self.buckets[index][0] == key):
+                self.buckets[index] = (key, value)
+                return None
+        position = self._find_in_stash(key)
+        if position is not None:
+            self.stash[position] = (hash_code, (key, value))
+            return None
+        left_over = self._place(hash_code, (key, value))
+        self.size += 1
+        if left_over is not None:
+            self._rehash(len(self.buckets), [left_over], reseed=True)
+        # Check if the load factor exceeds the policy's threshold
+        elif self.policy.should_grow(self.size, len(self.buckets)):
+            self._resize()
+
+    def delete(self, key):
+        """Delete the given key and its associated value, or raise KeyError.
+
+           Worst case running time: O(1), since the entry's slot is simply
+           emptied: no other entry's lookup depends on it.
+
+        """
+        index = self._find_slot(key)
+        if index is not None:
+            self.buckets[index] = None
+            self.hash_codes[index] = None
+        else:
+            position = self._find_in_stash(key)
+            if position is None:
+                raise KeyError('Key not found: {}'.format(key))
+            del self.stash[position]
+        self.size -= 1
+        self._shrink_if_sparse()
+
+    def _rehash(self, num_slots, extra_entries=(), reseed=False):
+        """Place all entries, plus the given (hash code, entry) pairs, in the
+           given number of slots, with new hash functions if reseed is True.
+           Entries that still find no slot go in the stash.
+
+           Best and worst case running time: O(n)
+
+        """
+        entries = [(hash_code, entry) for hash_code, entry
+                   in zip(self.hash_codes, self.buckets) if entry is not None]
+        entries.extend(self.stash)
+        entries.extend(extra_entries)
+        if reseed:
+            self.multipliers = tuple(self.random.getrandbits(64) | 1
+                                     for multiplier in self.multipliers)
+        self.buckets = [None for i in range(_next_power_of_two(num_slots))]
+        self.hash_codes = [None for i in range(len(self.buckets))]
+        self.stash = []
+        for hash_code, entry in entries:
+            left_over = self._place(hash_code, entry)
+            if left_over is not None:
+                self.stash.append(left_over)
+
+    def _resize(self, new_size=None):
+        """Resize this hash table's slots and place all key-value entries
+           again, retrying any stashed entries.
+
+           Best and worst case running time: O(n)
+
+        """
+        if new_size is None:
+            new_size = self.policy.grown_size(len(self.buckets))
+        self._rehash(new_size)
+
+    def memory_usage(self):
+        """Return the number of bytes used by this hash table's structure,
+           not counting the key and value objects themselves.
+
+           Best and worst case running time: O(b) for b slots.
+
+        """
+        return (HashTableProbing.memory_usage(self) +
+                sys.getsizeof(self.hash_codes) + sys.getsizeof(self.stash))
+
+
+# Control bytes of a SwissHashTable slot: a full slot holds the low 7 bits of
+# its entry's hash code, and the other two have their top bit set
+_CTRL_EMPTY = 0x80
+_CTRL_DELETED = 0xfe
+_GROUP_SIZE = 16  # Slots whose control bytes are matched at once
+# A group's control bytes, read as one 128-bit int, are matched all at once
+# with bitwise arithmetic on these masks of the lowest and highest bit of
+# each byte (as SIMD instructions would, but on a Python int)
+_LOW_BITS = int.from_bytes(b'\x01' * _GROUP_SIZE, 'little')
+_HIGH_BITS = _LOW_BITS * 0x80
+
+
+def _match_byte(word, byte):
+    """Return a mask with the high bit set in each byte of the given word
+       equal to the given byte. A byte just above a match may also be set,
+       so each match has to be checked.
+    """
+    word ^= _LOW_BITS * byte  # Bytes equal to the given byte become 0
+    return (word - _LOW_BITS) & ~word & _HIGH_BITS
+
+
+def _mask_offsets(mask):
+    """Return a generator of the offsets of the bytes with their high bit set
+       in the given mask, from lowest to highest.
+    """
+    while mask:
+        lowest = mask & -mask
+        yield (lowest.bit_length() >> 3) - 1
+        mask ^= lowest
+
+
+class SwissHashTable(HashTableProbing):
+    '''A hash table that resolves collisions using open addressing over
+       groups of slots, as in the Swiss tables of Abseil.
+
+       Each slot has a control byte, holding 7 bits of its key's hash code if
+       it is full. A lookup matches all 16 control bytes of a group at once,
+       and only compares keys in the slots whose bits match, so it rarely
+       compares more than the one key it is looking for.
+    '''
+    # Matching whole groups keeps probes short even when the table is full,
+    # and it never has fewer slots than one group
+    DEFAULT_POLICY = ResizePolicy(grow_at=0.875, min_size=_GROUP_SIZE)
+
+    def __init__(self, init_size=16, probing='quadratic', policy=None,
+                 hasher=None, track_stats=False):
+        """Initialize this hash table with the given initial size, the name
+           of the probing strategy used to step from group to group, the
+           ResizePolicy that decides when it grows and shrinks, the hasher
+           for its keys, and whether it counts the work it does, in the same
+           order as HashTableProbing takes them.
+
+           The number of slots is rounded up to a power of two, and at least
+           one group of 16 slots.
+
+        """
+        if probing not in self.PROBING_STRATEGIES:
+            raise ValueError('Unknown probing strategy: {}'.format(probing))
+        self.probing = probing
+        self.policy = self._checked_policy(policy)
+        if self.policy.min_size < _GROUP_SIZE:
+            # Otherwise a table of one group would keep "shrinking" to one
+            # group, rebuilding itself on every sparse delete
+            self.policy = ResizePolicy(
+                self.policy.grow_at, self.policy.shrink_at,
+                self.policy.factor, _GROUP_SIZE, self.policy.compact_at)
+        self.hasher = hash if hasher is None else hasher
+        self._allocate(max(_GROUP_SIZE, _next_power_of_two(init_size)))
+        self.size = 0  # Number of key-value entries
+        self.deleted = 0  # Number of tombstones left behind by delete
+        if track_stats:
+            self.counters = TableStats()
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'SwissHashTable({!r})'.format(self.items())
+
+    def _allocate(self, num_slots):
+        """Replace the slots and control bytes with the given number of empty
+           ones.
+        """
+        self.buckets = [None for i in range(num_slots)]
+        self.control = bytearray([_CTRL_EMPTY]) * num_slots
+
+    def _groups(self, hash_code):
+        """Return a generator of the start index of each group to visit for a
+           key with the given hash code, from its home group in the order of
+           the probing strategy, which visits each group once before it
+           repeats. The 7 bits kept in the control bytes are left out.
+        """
+        num_groups = len(self.buckets) // _GROUP_SIZE
+        for group in self._probe(hash_code >> 7, num_groups):
+            yield group * _GROUP_SIZE
+
+    def _group_word(self, start):
+        """Return the control bytes of the group at the given index as one
+           int.
+        """
+        return int.from_bytes(self.control[start:start + _GROUP_SIZE],
+                              'little')
+
+    def _find_slot(self, key):
+        """Return the index of the slot that holds the given key, or None.
+
+           Average running time: O(1). Each group visited costs one match of
+           its control bytes, and a key comparison only for the slots whose 7
+           bits of hash code match, which is 1 in 128 of the other keys.
+
+        """
+        hash_code = self.hasher(key)
+        tag = hash_code & 0x7f
+        probes = 0
+        found = None
+        for start in self._groups(hash_code):
+            probes += 1
+            word = self._group_word(start)
+            for offset in _mask_offsets(_match_byte(word, tag)):
+                entry = self.buckets[start + offset]
+                if entry is not None and entry[0] == key:
+                    found = start + offset
+                    break
+            # keys are never stored past a group with a slot never used
+            if found is not None or word & ~(word << 6) & _HIGH_BITS:
+                break
+        if self.counters is not None:
+            self.counters.record_lookup(probes, found is not None)
+        return found
+
+    def set(self, key, value):
+        """Insert or update the given key with its associated value.
+
+           Average running time: O(1), as in _find_slot, with the new entry
+           placed in the first empty or deleted slot along the way.
+
+        """
+        hash_code = self.hasher(key)
+        tag = hash_code & 0x7f
+        free_index = None
+        for start in self._groups(hash_code):
+            word = self._group_word(start)
+            for offset in _mask_offsets(_match_byte(word, tag)):
+                entry = self.buckets[start + offset]
+                if entry is not None and entry[0] == key:
+                    # the key is already present, so update its value
+                    self.buckets[start + offset] = (key, value)
+                    return None
+            # Empty and deleted slots are the ones with their high bit set
+            if free_index is None and word & _HIGH_BITS:
+                free_index = start + next(_mask_offsets(word & _HIGH_BITS))
+            if word & ~(word << 6) & _HIGH_BITS:
+                break
+        if self.counters is not None:
+            home = next(self._groups(hash_code))
+            self.counters.record_insert(free_index // _GROUP_SIZE !=
+                                        home // _GROUP_SIZE)
+        if self.control[free_index] == _CTRL_DELETED:
+            self.deleted -= 1
+        self.control[free_index] = tag
+        self.buckets[free_index] = (key, value)
+        self.size += 1
+        # Check if the load factor exceeds the policy's threshold
+        if self.policy.should_grow(self.size + self.deleted,
+                                   len(self.buckets)):
+            self._resize()
+
+    def delete(self, key):
+        """Delete the given key and its associated value, or raise KeyError.
+
+           Average running time: O(1). If the slot's group still has an empty
+           slot, no probe has ever gone past the group, so the slot can be
+           marked empty again rather than deleted.
+
+        """
+        index = self._find_slot(key)
+        if index is None:
+            raise KeyError('Key not found: {}'.format(key))
+        word = self._group_word(index - index % _GROUP_SIZE)
+        if word & ~(word << 6) & _HIGH_BITS:
+            self.control[index] = _CTRL_EMPTY
+        else:
+            self.control[index] = _CTRL_DELETED
+            self.deleted += 1
+        self.buckets[index] = None
+        self.size -= 1
+        self._shrink_if_sparse()
+
+    def _resize(self, new_size=None):
+        """Resize this hash table's slots and rehash all key-value entries,
+           dropping any tombstones along the way.
+
+           Best and worst case running time: O(n)
+
+        """
+        if new_size is None:
+            new_size = len(self.buckets)
+            if self.size / new_size > self.policy.grow_at / self.policy.factor:
+                new_size = self.policy.grown_size(new_size)
+        # Entries moved over are not counted as new inserts
+        counters, self.counters = self.counters, None
+        if counters is not None:
+            counters.resizes += 1
+            start = time.perf_counter()
+        old_slots = self.buckets
+        self._allocate(max(_GROUP_SIZE, _next_power_of_two(new_size)))
+        self.size = 0
+        self.deleted = 0
+        try:
+            for entry in old_slots:
+                if entry is not None:
+                    self.set(entry[0], entry[1])
+        finally:
+            self.counters = counters
+        if counters is not None:
+            counters.resize_seconds += time.perf_counter() - start
+
+    def memory_usage(self):
+        """Return the number of bytes used by this hash table's structure,
+           not counting the key and value objects themselves.
+
+           Best and worst case running time: O(b) for b slots.
+
+        """
+        return (HashTableProbing.memory_usage(self) +
+                sys.getsizeof(self.control))
+
+
+class CompactHashTable(HashTableProbing):
+    '''A hash table that stores its entries in parallel arrays of hashes,
+       keys and values, and resolves collisions using open addressing.
+    '''
+    def __init__(self, init_size=8, probing='linear', policy=None,
+                 hasher=None):
+        """Initialize this hash table with the given initial size, the name
+           of the probing strategy used to resolve collisions, the
+           ResizePolicy that decides when it grows and shrinks, and the
+           hasher for its keys.
+
+           Instead of a tuple per entry, each slot is an index into three
+           arrays: the cached hash codes (packed as machine integers, so any
+           hash code is first folded into the signed 64-bit range), the
+           keys, and the values.
+
+        """
+        if probing not in self.PROBING_STRATEGIES:
+            raise ValueError('Unknown probing strategy: {}'.format(probing))
+        self.probing = probing
+        self._allocate(_next_power_of_two(init_size))
+        self.size = 0  # Number of key-value entries
+        self.deleted = 0  # Number of tombstones left behind by delete
+        self.policy = self._checked_policy(policy)
+        self.hasher = hash if hasher is None else hasher
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'CompactHashTable({!r})'.format(self.items())
+
+    def _allocate(self, num_slots):
+        """Replace the slot arrays with the given number of empty slots."""
+        self.hashes = array('q', bytes(8 * num_slots))
+        self.slot_keys = [_EMPTY] * num_slots
+        self.slot_values = [None] * num_slots
+
+    def _num_buckets(self):
+        """Return the number of slots in this hash table."""
+        return len(self.slot_keys)
+
+    def _find_slot(self, key):
+        """Return the index of the slot that holds the given key, or None.
+
+           Average running time: O(1). Keys are only compared with == when
+           their cached hash codes are equal.
+
+        """
+        hash_code = _fold_64(self.hasher(key))
+        for index in self._probe(hash_code, len(self.slot_keys)):
+            slot_key = self.slot_keys[index]
+            if slot_key is _EMPTY:
+                return None
+            if (self.hashes[index] == hash_code and slot_key is not _DELETED
+                    and slot_key == key):
+                return index
+        return None
+
+    def load_factor(self):
+        """Return the ratio of used slots (live entries and tombstones) to the
+           total number of slots.
+
+           Best and worst case running time: O(1)
+
+        """
+        return (self.size + self.deleted) / len(self.slot_keys)
+
+    def iter_items(self):
+        """Return a generator of all entries (key-value pairs) in this hash
+           table, skipping empty slots and tombstones.
+
+           Best and worst case running time: O(b) for b slots.
+
+        """
+        for index, key in enumerate(self.slot_keys):
+            if key is not _EMPTY and key is not _DELETED:
+                yield (key, self.slot_values[index])
+
+    def get(self, key):
+        """Return the value associated with the given key, or raise KeyError.
+
+           Average running time: O(1)
+
+        """
+        index = self._find_slot(key)
+        if index is None:
+            raise KeyError('Key not found: {}'.format(key))
+        return self.slot_values[index]
+
+    def set(self, key, value):
+        """Insert or update the given key with its associated value.
+
+           Average running time: O(1), as in HashTableProbing.set, but the
+           entry is written into the three arrays instead of a new tuple.
+
+        """
+        hash_code = _fold_64(self.hasher(key))
+        free_index = None
+        for index in self._probe(hash_code, len(self.slot_keys)):
+            slot_key = self.slot_keys[index]
+            if slot_key is _EMPTY:
+                if free_index is None:
+                    free_index = index
+                break
+            if slot_key is _DELETED:
+                if free_index is None:
+                    free_index = index
+            elif self.hashes[index] == hash_code and slot_key == key:
+                self.slot_values[index] = value
+                return None
+        if self.slot_keys[free_index] is _DELETED:
+            self.deleted -= 1
+        self.hashes[free_index] = hash_code
+        self.slot_keys[free_index] = key
+        self.slot_values[free_index] = value
+        self.size += 1
+        # Check if the load factor exceeds the policy's threshold
+        if self.policy.should_grow(self.size + self.deleted,
+                                   len(self.slot_keys)):
+            self._resize()
+
+    def delete(self, key):
+        """Delete the given key and its associated value, or raise KeyError.
+
+           Average running time: O(1)
+
+        """
+        index = self._find_slot(key)
+        if index is None:
+            raise KeyError('Key not found: {}'.format(key))
+        self.slot_keys[index] = _DELETED
+        self.slot_values[index] = None
+        self.size -= 1
+        self.deleted += 1
+        self._shrink_if_sparse()
+
+    def _resize(self, new_size=None):
+        """Resize this hash table's slot arrays and rehash all entries,
+           dropping any tombstones along the way.
+
+           Best and worst case running time: O(n)
+
+        """
+        if new_size is None:
+            new_size = len(self.slot_keys)
+            if self.size / new_size > self.policy.grow_at / self.policy.factor:
+                new_size = self.policy.grown_size(new_size)
+        old_keys, old_values = self.slot_keys, self.slot_values
+        self._allocate(_next_power_of_two(new_size))
+        self.size = 0
+        self.deleted = 0
+        for index, key in enumerate(old_keys):
+            if key is not _EMPTY and key is not _DELETED:
+                self.set(key, old_values[index])
+
+    def memory_usage(self):
+        """Return the number of bytes used by this hash table's structure,
+           not counting the key and value objects themselves.
+
+           Best and worst case running time: O(1)
+
+        """
+        return (_object_size(self) + sys.getsizeof(self.hashes) +
+                sys.getsizeof(self.slot_keys) +
+                sys.getsizeof(self.slot_values))
+
+
+class OrderedHashTable(HashTableProbing):
+    '''A hash table that remembers the order its keys were inserted in, using
+       the layout of CPython's dict: a dense array of entries in insertion
+       order, and a sparse array of slots holding indices into it.
+    '''
+    # Values of a slot in the sparse array that do not index an entry
+    FREE = -1  # The slot has never been used
+    DUMMY = -2  # The slot's entry was deleted, so probing continues past it
+
+    def __init__(self, init_size=8, probing='linear', policy=None,
+                 hasher=None):
+        """Initialize this hash table with the given initial size, the name
+           of the probing strategy used to resolve collisions, the
+           ResizePolicy that decides when it grows and shrinks, and the
+           hasher for its keys.
+
+           The sparse slots are packed machine integers, only as wide as the
+           number of slots needs, and the dense entries are kept in parallel
+           arrays of hash codes (folded into the signed 64-bit range, to pack
+           them), keys and values, with no empty gaps.
+
+        """
+        if probing not in self.PROBING_STRATEGIES:
+            raise ValueError('Unknown probing strategy: {}'.format(probing))
+        self.probing = probing
+        self._allocate(_next_power_of_two(init_size))
+        self.size = 0  # Number of key-value entries
+        self.deleted = 0  # Number of deleted entries not yet compacted away
+        self.policy = self._checked_policy(policy)
+        self.hasher = hash if hasher is None else hasher
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'OrderedHashTable({!r})'.format(self.items())
+
+    def _allocate(self, num_slots):
+        """Replace the sparse slots with the given number of free slots, and
+           the dense entries with empty arrays.
+        """
+        if num_slots <= 0x7f:
+            typecode = 'b'
+        elif num_slots <= 0x7fff:
+            typecode = 'h'
+        elif num_slots <= 0x7fffffff:
+            typecode = 'i'
+        else:
+            typecode = 'q'
+        self.indices = array(typecode, [self.FREE]) * num_slots
+        self.entry_hashes = array('q')
+        self.entry_keys = []
+        self.entry_values = []
+
+    def _num_buckets(self):
+        """Return the number of sparse slots in this hash table."""
+        return len(self.indices)
+
+    def _find_slot(self, key):
+        """Return the index of the sparse slot that points to the entry with
+           the given key, or None.
+
+           Average running time: O(1). Keys are only compared with == when
+           their cached hash codes are equal.
+
+        """
+        hash_code = _fold_64(self.hasher(key))
+        for index in self._probe(hash_code, len(self.indices)):
+            entry_index = self.indices[index]
+            if entry_index == self.FREE:
+                return None
+            if (entry_index != self.DUMMY and
+                    self.entry_hashes[entry_index] == hash_code and
+                    self.entry_keys[entry_index] == key):
+                return index
+        return None
+
+    def load_factor(self):
+        """Return the ratio of used slots (live and deleted entries) to the
+           total number of sparse slots.
+
+           Best and worst case running time: O(1)
+
+        """
+        return len(self.entry_keys) / len(self.indices)
+
+    def iter_items(self):
+        """Return a generator of all entries (key-value pairs) in this hash
+           table, in the order their keys were first inserted.
+
+           Best and worst case running time: O(n + d) for d deleted entries,
+           rather than O(b) for b slots, since the dense entries have no
+           empty gaps, and are read in order from start to end.
+
+        """
+        for index, key in enumerate(self.entry_keys):
+            if key is not _DELETED:
+                yield (key, self.entry_values[index])
+
+    def get(self, key):
+        """Return the value associated with the given key, or raise KeyError.
+
+           Average running time: O(1)
+
+        """
+        index = self._find_slot(key)
+        if index is None:
+            raise KeyError('Key not found: {}'.format(key))
+        return self.entry_values[self.indices[index]]
+
+    def set(self, key, value):
+        """Insert or update the given key with its associated value. Updating
+           a key keeps its place in the order, and a new key goes last.
+
+           Average running time: O(1), as in HashTableProbing.set, with the
+           new entry appended to the dense arrays.
+
+        """
+        hash_code = _fold_64(self.hasher(key))
+        free_index = None
+        for index in self._probe(hash_code, len(self.indices)):
+            entry_index = self.indices[index]
+            if entry_index == self.FREE:
+                if free_index is None:
+                    free_index = index
+                break
+            if entry_index == self.DUMMY:
+                if free_index is None:
+                    free_index = index
+            elif (self.entry_hashes[entry_index] == hash_code and
+                    self.entry_keys[entry_index] == key):
+                self.entry_values[entry_index] = value
+                return None
+        if self.indices[free_index] == self.DUMMY:
+            # The deleted entry stays in the dense arrays until compacted
+            self.deleted -= 1
+        self.indices[free_index] = len(self.entry_keys)
+        self.entry_hashes.append(hash_code)
+        self.entry_keys.append(key)
+        self.entry_values.append(value)
+        self.size += 1
+        # The dense arrays only shrink on resize, so their length counts
+        # every slot that was ever used since then
+        if self.policy.should_grow(len(self.entry_keys), len(self.indices)):
+            self._resize()
+
+    def delete(self, key):
+        """Delete the given key and its associated value, or raise KeyError.
+
+           Average running time: O(1). The entry is marked deleted in place,
+           so the entries after it keep their indices.
+
+        """
+        index = self._find_slot(key)
+        if index is None:
+            raise KeyError('Key not found: {}'.format(key))
+        entry_index = self.indices[index]
+        self.indices[index] = self.DUMMY
+        self.entry_keys[entry_index] = _DELETED
+        self.entry_values[entry_index] = None
+        self.size -= 1
+        self.deleted += 1
+        self._shrink_if_sparse()
+
+    def _resize(self, new_size=None):
+        """Resize this hash table's sparse slots and rehash all entries,
+           compacting the dense arrays in the same order.
+
+           Best and worst case running time: O(n)
+
+        """
+        if new_size is None:
+            new_size = len(self.indices)
+            if self.size / new_size > self.policy.grow_at / self.policy.factor:
+                new_size = self.policy.grown_size(new_size)
+        old_entries = list(self.iter_items())
+        self._allocate(_next_power_of_two(new_size))
+        self.size = 0
+        self.deleted = 0
+        for key, value in old_entries:
+            self.set(key, value)
+
+    def memory_usage(self):
+        """Return the number of bytes used by this hash table's structure,
+           not counting the key and value objects themselves.
+
+           Best and worst case running time: O(1)
+
+        """
+        return (_object_size(self) + sys.getsizeof(self.indices) +
+                sys.getsizeof(self.entry_hashes) +
+                sys.getsizeof(self.entry_keys) +
+                sys.getsizeof(self.entry_values))
+
+
+def compare_memory_usage(items, tables=(HashTable, HashTableProbing,
+                                        CompactHashTable,
+                                        OrderedHashTable)):
+    """Return a list of (class name, bytes used) pairs, one for each of the
+       given hash table classes loaded with the given key-value pairs, so the
+       overhead of their storage layouts can be compared.
+    """
+    report = []
+    for table_class in tables:
+        table = table_class()
+        for key, value in items:
+            table.set(key, value)
+        report.append((table_class.__name__, table.memory_usage()))
+    return report
+
+
+def benchmark_lookups(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7),
+                      table_class=HashTableProbing, num_lookups=10000):
+    """Return a list of (size, seconds per lookup, slots probed per lookup)
+       triples, one for each of the given sizes of a table of the given
+       class, timing num_lookups random hits and as many misses. Lookups that
+       start at the key's home slot take the same time however large the
+       table grows, while a scan from slot 0 would slow down in proportion.
+
+       Running time: O(n) for the largest size n, to build the tables.
+
+    """
+    report = []
+    for size in sizes:
+        keys = ['key-{}'.format(number) for number in range(size)]
+        table = table_class.from_items((key, True) for key in keys)
+        lookups = [keys[random.randrange(size)] for i in range(num_lookups)]
+        lookups += ['miss-{}'.format(number) for number in range(num_lookups)]
+        start = time.perf_counter()
+        for key in lookups:
+            table.contains(key)
+        seconds = time.perf_counter() - start
+        # Count the probes on a second pass, so counting does not slow the
+        # timed one
+        table.counters = TableStats()
+        for key in lookups:
+            table.contains(key)
+        probes = sum(length * count for length, count
+                     in table.counters.probe_lengths.items())
+        report.append((size, seconds / len(lookups), probes / len(lookups)))
+        del keys, table  # Free this size's table before building the next
+    return report
 
 
 def test_hash_table():
@@ -1,6 +1,11 @@
 #!python
 
-from hashtable import HashTable, HashTableProbing
+from hashtable import HashTable, HashTableProbing, RobinHoodHashTable
+from hashtable import CompactHashTable, compare_memory_usage, ResizePolicy
+from hashtable import ConcurrentHashTable, SnapshotHashTable, CuckooHashTable
+from hashtable import OrderedHashTable, SwissHashTable, benchmark_lookups
+from hashers import FNVHasher, SipHasher, fnv1a_64, key_bytes
+import threading
 import unittest
 # Python 2 and 3 compatibility: unittest module renamed this assertion method
 if not hasattr(unittest.TestCase, 'assertCountEqual'):
@@ -87,6 +92,51 @@ class HashTableTest(unittest.TestCase):
         assert len(ht.buckets) == 8
         assert ht.load_factor() == 0.5
 
+    def test_incremental_resize(self):
+        ht = HashTable(16)
+        for number in range(12):
+            ht.set(number, number * 10)
+        assert ht.old_buckets is None
+        ht.set(12, 120)  # Should trigger resize
+        assert len(ht.buckets) == 32
+        assert len(ht.old_buckets) == 16  # Not all moved over yet
+        assert ht.rehash_index == HashTable.REHASH_STEP
+        self.assertCountEqual(ht.keys(), range(13))
+        # Every kind of operation works while the resize is in progress
+        assert ht.get(3) == 30
+        assert ht.contains(11) is True
+        ht.set(5, 55)  # Update value
+        ht.delete(7)
+        assert ht.contains(7) is False
+        assert ht.size == 12
+        # Each operation moved over a few more of the old buckets
+        assert ht.old_buckets is None
+        self.assertCountEqual(ht.items(), [(number, number * 10) for number
+                                           in range(13) if number not in
+                                           (5, 7)] + [(5, 55)])
+
+    def test_resize_creates_buckets_lazily(self):
+        ht = HashTable(1024)
+        for number in range(768):
+            ht.set(number, number)
+        assert ht.old_buckets is None
+        ht.set(768, 768)  # Should trigger resize
+        assert len(ht.buckets) == 2048
+        # Only the buckets that entries were moved into so far are created,
+        # not one LinkedList for each of the 2048 new buckets
+        created = sum(1 for bucket in ht.buckets if bucket is not None)
+        assert created <= 2 * (HashTable.REHASH_STEP + 1)
+        assert ht.stats()['chain_lengths'][0] >= 2048 - created
+        self.assertCountEqual(ht.keys(), range(769))
+
+    def test_lookups_while_iterating_during_resize(self):
+        ht = HashTable(16)
+        for number in range(13):  # The last one triggers a resize
+            ht.set(number, number)
+        assert ht.old_buckets is not None
+        keys = [key for key in ht.iter_keys() if ht.get(key) is not None]
+        assert sorted(keys) == list(range(13))  # Each key once
+
     def test_contains(self):
         ht = HashTable()
         ht.set('I', 1)
@@ -141,6 +191,355 @@ class HashTableTest(unittest.TestCase):
         with self.assertRaises(KeyError):
             ht.delete('A')  # Key does not exist
 
+    def test_delete_from_chain(self):
+        ht = HashTable(8, policy=ResizePolicy(grow_at=4, shrink_at=0))
+        for number in (0, 8, 16, 24):
+            ht.set(number, number)  # All in bucket 0
+        bucket = ht.buckets[0]
+        ht.delete(8)  # Middle
+        ht.delete(24)  # Tail
+        assert bucket.items() == [(0, 0, 0), (16, 16, 16)]
+        assert bucket.tail.data == (16, 16, 16)
+        assert bucket.length() == 2
+        ht.delete(0)  # Head
+        assert bucket.head is bucket.tail
+        ht.delete(16)
+        assert bucket.is_empty() is True
+        assert bucket.tail is None
+        assert ht.size == 0
+
+    def test_shrink_on_delete(self):
+        ht = HashTable(8)
+        for number in range(13):
+            ht.set(number, number)
+        assert len(ht.buckets) == 32
+        for number in range(6):
+            ht.delete(number)
+        assert len(ht.buckets) == 32  # Load factor 7/32 is not below 0.2
+        ht.delete(6)  # Should trigger shrink
+        assert len(ht.buckets) == 16
+        self.assertCountEqual(ht.keys(), range(7, 13))
+        for number in range(7, 13):
+            ht.delete(number)
+        assert len(ht.buckets) == 8  # Never shrinks below min_size
+        assert ht.size == 0
+
+    def test_custom_policy(self):
+        policy = ResizePolicy(grow_at=2.0, shrink_at=0, factor=4)
+        ht = HashTable(2, policy=policy)
+        for number in range(4):
+            ht.set(number, number)
+        assert len(ht.buckets) == 2  # Load factor 2.0 is allowed
+        ht.set(4, 4)  # Should trigger resize
+        assert len(ht.buckets) == 8
+        for number in range(5):
+            ht.delete(number)
+        assert len(ht.buckets) == 8  # Shrinking is turned off
+        ht = HashTable.from_items([(1, 1), (2, 2)], expected_size=40,
+                                  policy=policy)
+        assert len(ht.buckets) == 32  # 21 needed, rounded to a power of two
+        assert ht.policy is policy
+
+    def test_iterators(self):
+        ht = HashTable()
+        assert list(ht.iter_items()) == []
+        ht.set('I', 1)
+        ht.set('V', 5)
+        ht.set('X', 10)
+        keys = ht.iter_keys()
+        assert iter(keys) is keys  # A generator, not a list
+        self.assertCountEqual(keys, ['I', 'V', 'X'])
+        self.assertCountEqual(ht.iter_values(), [1, 5, 10])
+        self.assertCountEqual(ht.iter_items(), [('I', 1), ('V', 5), ('X', 10)])
+        assert list(ht.iter_items()) == ht.items()
+
+    def test_container_protocol(self):
+        ht = HashTable()
+        assert len(ht) == 0
+        ht.set('I', 1)
+        ht.set('V', 5)
+        assert len(ht) == 2
+        self.assertCountEqual(list(ht), ['I', 'V'])
+        assert 'I' in ht
+        assert 'A' not in ht
+        assert ht['V'] == 5
+        with self.assertRaises(KeyError):
+            ht['A']  # Key does not exist
+
+    def test_rounds_buckets_to_power_of_two(self):
+        ht = HashTable(3)
+        assert len(ht.buckets) == 4
+        ht._resize(9)
+        assert len(ht.buckets) == 16
+
+    def test_hashers(self):
+        for hasher in (FNVHasher(), SipHasher()):
+            ht = HashTable(hasher=hasher)
+            keys = ['I', b'V', 10, 2.5, ('L', 50), None]
+            for key in keys:
+                ht.set(key, repr(key))
+            for key in keys:
+                assert ht.get(key) == repr(key)
+            assert ht.get(10.0) == repr(10)  # Equal keys hash the same
+            assert ht.contains('A') is False
+            assert ht.hasher is hasher
+            ht = HashTable.from_items([('I', 1)], hasher=hasher)
+            assert ht.hasher is hasher
+            assert ht.get('I') == 1
+
+    def test_sip_hasher_spreads_colliding_ints(self):
+        # With the built-in hash, multiples of 1024 all share bucket 0
+        keys = [number * 1024 for number in range(64)]
+        ht = HashTable(1024)
+        for key in keys:
+            ht.set(key, key)
+        assert ht.buckets[0].length() == 64
+        ht = HashTable(1024, hasher=SipHasher(bytes(range(16))))
+        for key in keys:
+            ht.set(key, key)
+        assert max(bucket.length() for bucket in ht.buckets
+                   if bucket is not None) < 8
+
+    def test_from_items(self):
+        ht = HashTable.from_items([('I', 1), ('V', 5), ('X', 10)])
+        assert len(ht.buckets) == 8
+        self.assertCountEqual(ht.items(), [('I', 1), ('V', 5), ('X', 10)])
+        # The buckets are sized up front, so loading never resizes
+        pairs = ((number, number * 2) for number in range(1000))
+        ht = HashTable.from_items(pairs, expected_size=1000)
+        assert len(ht.buckets) == 2048  # 1334 needed, rounded up
+        assert ht.old_buckets is None
+        assert ht.size == 1000
+        assert ht.load_factor() <= 0.75
+        assert ht.get(999) == 1998
+
+    def test_get_many_and_set_many(self):
+        ht = HashTable(4)
+        ht.set_many([('I', 1), ('V', 5), ('X', 10), ('L', 50)])
+        assert len(ht.buckets) == 8  # Resized once, to fit all the pairs
+        assert ht.size == 4
+        ht.set_many(iter([('V', 4), ('C', 100)]))
+        assert ht.size == 5
+        assert ht.get_many(['C', 'I', 'V']) == [100, 1, 4]
+        assert ht.get_many([]) == []
+        with self.assertRaises(KeyError):
+            ht.get_many(['I', 'A'])  # Key does not exist
+
+    def test_compares_hash_codes_before_keys(self):
+        comparisons = []
+
+        class Key(object):
+            def __init__(self, name, hash_code):
+                self.name = name
+                self.hash_code = hash_code
+
+            def __hash__(self):
+                return self.hash_code
+
+            def __eq__(self, other):
+                comparisons.append((self.name, other.name))
+                return self.name == other.name
+
+        ht = HashTable(8)
+        # Hash codes 1 and 9 share bucket 1 of 8, but are never compared
+        first, second = Key('first', 1), Key('second', 9)
+        ht.set(first, 1)
+        ht.set(second, 2)
+        assert ht.get(second) == 2
+        assert comparisons == [('second', 'second')]
+        # Keys with equal hash codes still need to be compared with ==
+        assert ht.contains(Key('collider', 1)) is False
+        assert comparisons[-1] == ('first', 'collider')
+
+    def test_stats(self):
+        ht = HashTable(8, track_stats=True)
+        ht.set(1, 'one')
+        ht.set(9, 'nine')  # Collides with 1 in bucket 1
+        ht.set(2, 'two')
+        ht.set(2, 'deux')  # Updates are not inserts
+        assert ht.get(9) == 'nine'  # Compares 1, then 9
+        assert ht.contains(17) is False  # Compares 1 and 9
+        assert ht.contains(3) is False  # Empty bucket
+        stats = ht.stats()
+        assert stats['size'] == 3
+        assert stats['buckets'] == 8
+        assert stats['chain_lengths'] == {0: 6, 1: 1, 2: 1}
+        assert stats['inserts'] == 3
+        assert stats['collisions'] == 1
+        assert stats['collisions_per_insert'] == 1 / 3
+        assert stats['hits'] == 1
+        assert stats['misses'] == 2
+        assert stats['hit_ratio'] == 1 / 3
+        assert stats['probe_lengths'] == {0: 1, 2: 2}
+        assert stats['resizes'] == 0
+        for number in range(10, 15):
+            ht.set(number, number)
+        assert ht.stats()['resizes'] == 1
+        assert ht.stats()['resize_seconds'] > 0
+
+    def test_stats_not_tracked(self):
+        ht = HashTable(8)
+        ht.set('I', 1)
+        assert ht.get('I') == 1
+        assert ht.stats() == {'size': 1, 'buckets': 8, 'load_factor': 0.125,
+                              'chain_lengths': {0: 7, 1: 1}}
+
+
+class ConcurrentHashTableTest(unittest.TestCase):
+
+    def test_init(self):
+        ht = ConcurrentHashTable(4, num_stripes=6)
+        assert len(ht.locks) == 8
+        assert len(ht.buckets) == 8  # At least one bucket per stripe
+        assert ht.size == 0
+        assert ht.length() == 0
+
+    def test_set_get_and_delete(self):
+        ht = ConcurrentHashTable()
+        ht.set('I', 1)
+        ht.set('V', 4)
+        ht.set('V', 5)  # Update value
+        ht.set('X', 10)
+        assert ht.get('V') == 5
+        assert ht.contains('X') is True
+        assert ht.size == 3
+        self.assertCountEqual(ht.items(), [('I', 1), ('V', 5), ('X', 10)])
+        ht.delete('I')
+        assert ht.contains('I') is False
+        with self.assertRaises(KeyError):
+            ht.delete('I')  # Key no longer exists
+        with self.assertRaises(KeyError):
+            ht.get('A')  # Key does not exist
+        assert ht.size == 2
+
+    def test_resize_keeps_stripes(self):
+        ht = ConcurrentHashTable(16, num_stripes=4)
+        for number in range(100):
+            ht.set(number, number)
+        assert len(ht.buckets) == 256
+        assert sum(ht.counts) == 100
+        # Every key is still in the stripe its count was recorded in
+        for index, bucket in enumerate(ht.buckets):
+            for hash_code, key, value in bucket:
+                assert hash_code % 4 == index % 4
+        for number in range(90):
+            ht.delete(number)
+        assert len(ht.buckets) == 32
+        self.assertCountEqual(ht.keys(), range(90, 100))
+
+    def test_iter_items(self):
+        ht = ConcurrentHashTable(num_stripes=4)
+        for number in range(50):
+            ht.set(number, -number)
+        self.assertCountEqual(ht.iter_items(),
+                              [(number, -number) for number in range(50)])
+        # Changing the table while iterating over it does not deadlock
+        for key in ht.iter_keys():
+            ht.set(key, key)
+        assert ht.values() == ht.keys()
+
+    def test_threads_writing_and_reading(self):
+        ht = ConcurrentHashTable(num_stripes=8)
+        errors = []
+
+        def write(thread_number):
+            for number in range(500):
+                key = (thread_number, number)
+                ht.set(key, number)
+                if ht.get(key) != number:
+                    errors.append(key)
+            for number in range(0, 500, 2):
+                ht.delete((thread_number, number))
+
+        threads = [threading.Thread(target=write, args=(thread_number,))
+                   for thread_number in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert ht.size == 8 * 250
+        for thread_number in range(8):
+            assert ht.contains((thread_number, 0)) is False
+            assert ht.get((thread_number, 499)) == 499
+
+
+class SnapshotHashTableTest(unittest.TestCase):
+
+    def test_set_get_and_delete(self):
+        ht = SnapshotHashTable()
+        ht.set('I', 1)
+        ht.set('V', 4)
+        ht.set('V', 5)  # Update value
+        ht.set('X', 10)
+        assert ht.get('V') == 5
+        assert ht.contains('X') is True
+        assert ht.size == 3
+        self.assertCountEqual(ht.items(), [('I', 1), ('V', 5), ('X', 10)])
+        ht.delete('I')
+        assert ht.contains('I') is False
+        with self.assertRaises(KeyError):
+            ht.delete('I')  # Key no longer exists
+        with self.assertRaises(KeyError):
+            ht.get('A')  # Key does not exist
+        assert ht.size == 2
+        assert ht.version == 5  # One per successful write
+
+    def test_snapshots_are_never_changed(self):
+        ht = SnapshotHashTable(4)
+        ht.set('I', 1)
+        snapshot = ht.buckets
+        ht.set('I', 2)
+        ht.set('V', 5)
+        ht.set('X', 10)
+        ht.set('L', 50)  # Should trigger resize
+        assert len(ht.buckets) == 8
+        assert len(snapshot) == 4
+        assert [entry[1:] for bucket in snapshot for entry in bucket] == [
+            ('I', 1)]
+
+    def test_set_many_publishes_once(self):
+        ht = SnapshotHashTable(2)
+        ht.set_many((number, number) for number in range(100))
+        assert ht.version == 1
+        assert ht.size == 100
+        assert ht.load_factor() <= 0.75
+        assert ht.get_many([0, 99]) == [0, 99]
+
+    def test_from_items_publishes_once(self):
+        ht = SnapshotHashTable.from_items((number, str(number))
+                                          for number in range(1000))
+        assert ht.version == 1
+        assert ht.size == 1000
+        assert len(ht.buckets) == 2048  # 1334 needed, rounded up
+        assert ht.get(999) == '999'
+        ht = SnapshotHashTable.from_items([], expected_size=10)
+        assert ht.size == 0
+        assert len(ht.buckets) == 16
+
+    def test_readers_during_writes(self):
+        ht = SnapshotHashTable.from_items((number, number)
+                                          for number in range(100))
+        errors = []
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                for number in range(100):
+                    if ht.get(number) != number:
+                        errors.append(number)
+
+        readers = [threading.Thread(target=read) for i in range(4)]
+        for reader in readers:
+            reader.start()
+        for number in range(100, 2000):  # Several resizes along the way
+            ht.set(number, number)
+        done.set()
+        for reader in readers:
+            reader.join()
+        assert errors == []
+        assert ht.size == 2000
+
 
 class HashTableProbingTest(unittest.TestCase):
 
@@ -254,6 +653,673 @@ class HashTableProbingTest(unittest.TestCase):
         with self.assertRaises(KeyError):
             ht.delete('A')  # Key does not exist
 
+    def test_resize(self):
+        ht = HashTableProbing(4)
+        assert len(ht.buckets) == 4
+        ht.set('I', 1)
+        ht.set('V', 5)
+        ht.set('X', 10)
+        assert len(ht.buckets) == 4
+        assert ht.load_factor() == 0.75
+        ht.set('L', 50)  # Should trigger resize
+        assert len(ht.buckets) == 8
+        assert ht.load_factor() == 0.5
+        self.assertCountEqual(ht.keys(), ['I', 'V', 'X', 'L'])
+
+    def test_delete_leaves_tombstone(self):
+        ht = HashTableProbing(8)
+        for number in range(5):
+            ht.set(number, number * 10)
+        ht.delete(1)
+        assert ht.deleted == 1
+        assert ht.contains(1) is False
+        # Keys probed past the deleted slot are still found
+        for number in (0, 2, 3, 4):
+            assert ht.get(number) == number * 10
+        ht.set(1, 100)  # Reuses the tombstone
+        assert ht.deleted == 0
+        assert ht.get(1) == 100
+        assert ht.size == 5
+
+    def test_probing_strategies(self):
+        for probing in HashTableProbing.PROBING_STRATEGIES:
+            ht = HashTableProbing(probing=probing)
+            # Integers hash to themselves, so multiples of 8 all collide
+            keys = [number * 8 for number in range(100)]
+            for key in keys:
+                ht.set(key, str(key))
+            for key in keys[::2]:
+                ht.delete(key)
+            assert ht.size == 50
+            for key in keys[1::2]:
+                assert ht.get(key) == str(key)
+            for key in keys[::2]:
+                assert ht.contains(key) is False
+
+    def test_from_items_and_set_many(self):
+        ht = HashTableProbing.from_items([(number, number)
+                                          for number in range(100)])
+        assert len(ht.buckets) == 256
+        ht.set_many([(number, -number) for number in range(50, 150)])
+        assert ht.size == 150
+        assert ht.get_many([0, 50, 149]) == [0, -50, -149]
+
+    def test_iterators_skip_tombstones(self):
+        ht = HashTableProbing()
+        ht.set('I', 1)
+        ht.set('V', 5)
+        ht.delete('I')
+        assert list(ht.iter_items()) == [('V', 5)]
+        assert list(ht) == ['V']
+        assert len(ht) == 1
+        assert ht['V'] == 5
+
+    def test_hashers(self):
+        for table_class in (HashTableProbing, RobinHoodHashTable,
+                            CompactHashTable, ConcurrentHashTable,
+                            SnapshotHashTable):
+            ht = table_class(hasher=SipHasher())
+            for number in range(100):
+                ht.set(str(number), number)
+            for number in range(0, 100, 2):
+                ht.delete(str(number))
+            assert ht.get_many(['1', '99']) == [1, 99]
+            assert ht.contains('0') is False
+
+    def test_stats(self):
+        ht = HashTableProbing(8, track_stats=True)
+        ht.set(1, 'one')
+        ht.set(9, 'nine')  # Home slot 1 is taken, so it goes in slot 2
+        ht.set(2, 'two')  # Home slot 2 is taken, so it goes in slot 3
+        assert ht.get(9) == 'nine'  # Probes slots 1 and 2
+        assert ht.contains(17) is False  # Probes slots 1 to 4
+        ht.delete(1)
+        stats = ht.stats()
+        assert stats['size'] == 2
+        assert stats['tombstones'] == 1
+        assert stats['inserts'] == 3
+        assert stats['collisions'] == 2
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+        assert stats['probe_lengths'] == {1: 1, 2: 1, 4: 1}
+        for number in range(10, 20):
+            ht.set(number, number)
+        stats = ht.stats()
+        # Entries moved by the resize are not counted again
+        assert stats['inserts'] == 13
+        assert stats['resizes'] == 1
+        assert 'hits' not in HashTableProbing().stats()
+
+    def test_lookups_start_at_home_slot(self):
+        ht = HashTableProbing(1024, track_stats=True)
+        for number in range(0, 700, 7):
+            ht.set(number, number)
+        # Each int key hashes to itself, so each sits in its home slot, and
+        # each miss stops at the next, never used slot
+        assert ht.get(693) == 693
+        assert ht.contains(694) is False
+        ht.delete(350)
+        assert ht.stats()['probe_lengths'] == {1: 3}
+
+    def test_benchmark_lookups(self):
+        report = benchmark_lookups(sizes=(1000, 100000), num_lookups=1000)
+        assert [size for size, seconds, probes in report] == [1000, 100000]
+        small, large = report[0][2], report[1][2]
+        # A hundred times more entries, but about as many probes per lookup
+        assert large < 2 * small
+
+    def test_compact_on_tombstone_ratio(self):
+        ht = HashTableProbing(64)
+        for number in range(40):
+            ht.set(number, number)
+        for number in range(16):
+            ht.delete(number)
+        assert ht.deleted == 16  # A quarter of the slots
+        ht.delete(16)  # More than a quarter are tombstones
+        assert ht.deleted == 0
+        assert len(ht.buckets) == 64  # Still needed for 23 entries
+        self.assertCountEqual(ht.keys(), range(17, 40))
+        for table_class in (CompactHashTable, OrderedHashTable):
+            ht = table_class(64)
+            for number in range(40):
+                ht.set(number, number)
+            for number in range(17):
+                ht.delete(number)
+            assert ht.deleted == 0
+            assert ht.get_many([17, 39]) == [17, 39]
+
+    def test_unknown_probing_strategy(self):
+        with self.assertRaises(ValueError):
+            HashTableProbing(probing='random')
+
+    def test_shrink_on_delete(self):
+        ht = HashTableProbing(64)
+        for number in range(40):
+            ht.set(number, number)
+        for number in range(27):
+            ht.delete(number)
+        assert len(ht.buckets) == 64
+        ht.delete(27)  # Load factor 12/64 is below 0.2
+        assert len(ht.buckets) == 32
+        assert ht.deleted == 0  # Tombstones dropped by the rehash
+        self.assertCountEqual(ht.keys(), range(28, 40))
+
+
+class ResizePolicyTest(unittest.TestCase):
+
+    def test_defaults(self):
+        policy = ResizePolicy()
+        assert policy.should_grow(7, 8) is True
+        assert policy.should_grow(6, 8) is False
+        assert policy.should_shrink(3, 32) is True
+        assert policy.should_shrink(7, 32) is False
+        assert policy.should_shrink(0, 8) is False  # At min_size
+        assert policy.grown_size(8) == 16
+        assert policy.shrunk_size(32) == 16
+        assert policy.shrunk_size(12) == 8
+        assert policy.buckets_needed(3) == 5
+
+    def test_min_size_is_rounded_to_power_of_two(self):
+        policy = ResizePolicy(min_size=10)
+        assert policy.min_size == 16
+        assert policy.should_shrink(1, 16) is False  # Already at min_size
+        ht = HashTable(32, policy=policy, track_stats=True)
+        for number in range(4):
+            ht.set(number, number)
+        for number in range(3):
+            ht.delete(number)
+        assert len(ht.buckets) == 16
+        assert ht.stats()['resizes'] == 1  # Not one per delete
+
+    def test_concurrent_table_never_shrinks_below_stripes(self):
+        ht = ConcurrentHashTable(16, num_stripes=16)
+        ht.set('I', 1)
+        assert ht._is_sparse() is False
+        ht.delete('I')
+        assert len(ht.buckets) == 16
+
+    def test_sizes_are_integers(self):
+        policy = ResizePolicy(factor=3, shrink_at=0.1, min_size=1)
+        assert policy.shrunk_size(10) == 3
+        assert isinstance(policy.shrunk_size(10), int)
+        assert policy.grown_size(10) == 30
+
+    def test_invalid_thresholds(self):
+        with self.assertRaises(ValueError):
+            ResizePolicy(grow_at=0)
+        with self.assertRaises(ValueError):
+            ResizePolicy(grow_at=0.75, shrink_at=0.5)  # No hysteresis gap
+        with self.assertRaises(ValueError):
+            ResizePolicy(shrink_at=-0.1)
+        with self.assertRaises(ValueError):
+            ResizePolicy(factor=1.5)
+        with self.assertRaises(ValueError):
+            ResizePolicy(compact_at=0)
+
+    def test_open_addressing_rejects_full_tables(self):
+        # A chaining table may hold more entries than buckets
+        HashTable(4, policy=ResizePolicy(grow_at=1.0, shrink_at=0))
+        full = ResizePolicy(grow_at=1.0, shrink_at=0)
+        for table_class in (HashTableProbing, RobinHoodHashTable,
+                            CuckooHashTable, SwissHashTable,
+                            CompactHashTable, OrderedHashTable):
+            with self.assertRaises(ValueError):
+                table_class(4, policy=full)
+            table_class(4, policy=ResizePolicy(grow_at=0.9, shrink_at=0))
+
+    def test_should_compact(self):
+        policy = ResizePolicy()
+        assert policy.should_compact(3, 8) is True
+        assert policy.should_compact(2, 8) is False
+        assert ResizePolicy(compact_at=1).should_compact(8, 8) is False
+
+
+class RobinHoodHashTableTest(unittest.TestCase):
+
+    def test_init(self):
+        ht = RobinHoodHashTable(4)
+        assert len(ht.buckets) == 4
+        assert ht.length() == 0
+        assert ht.max_probe_distance() == -1
+        assert ht.mean_probe_distance() == 0
+
+    def test_set_and_get(self):
+        ht = RobinHoodHashTable()
+        ht.set('I', 1)
+        ht.set('V', 5)
+        ht.set('X', 10)
+        ht.set('V', 6)  # Update value
+        assert ht.get('I') == 1
+        assert ht.get('V') == 6
+        assert ht.get('X') == 10
+        assert ht.size == 3
+        self.assertCountEqual(ht.items(), [('I', 1), ('V', 6), ('X', 10)])
+        with self.assertRaises(KeyError):
+            ht.get('A')  # Key does not exist
+
+    def test_resize(self):
+        ht = RobinHoodHashTable(8)
+        for number in range(7):
+            ht.set(number, number)
+        assert len(ht.buckets) == 8
+        ht.set(7, 7)  # Load factor 1.0 should trigger resize
+        assert len(ht.buckets) == 16
+        assert ht.load_factor() == 0.5
+
+    def test_displacement_and_probe_distances(self):
+        ht = RobinHoodHashTable(16)
+        # 0, 16 and 32 share home slot 0, and 1 has home slot 1
+        for key in (0, 16, 1, 32):
+            ht.set(key, str(key))
+        # 32 displaces 1 from slot 2, which moves on to slot 3
+        assert ht.distances[:4] == [0, 1, 2, 2]
+        assert ht.buckets[2] == (32, '32')
+        assert ht.max_probe_distance() == 2
+        assert ht.mean_probe_distance() == 1.25
+        for key in (0, 16, 1, 32):
+            assert ht.get(key) == str(key)
+
+    def test_delete_shifts_entries_back(self):
+        ht = RobinHoodHashTable(16)
+        for key in (0, 16, 32, 1):
+            ht.set(key, str(key))
+        ht.delete(0)
+        assert ht.distances[:4] == [0, 1, 1, -1]
+        assert ht.contains(0) is False
+        for key in (16, 32, 1):
+            assert ht.get(key) == str(key)
+        with self.assertRaises(KeyError):
+            ht.delete(0)  # Key no longer exists
+        assert ht.size == 3
+
+    def test_many_entries_at_high_load(self):
+        ht = RobinHoodHashTable(1024)
+        keys = ['route-{}'.format(number) for number in range(900)]
+        for key in keys:
+            ht.set(key, key.upper())
+        assert len(ht.buckets) == 1024
+        for key in keys[::3]:
+            ht.delete(key)
+        for index, key in enumerate(keys):
+            assert ht.contains(key) is (index % 3 != 0)
+        assert ht.size == 600
+
+
+class CuckooHashTableTest(unittest.TestCase):
+
+    def test_init(self):
+        ht = CuckooHashTable(4)
+        assert len(ht.buckets) == 4
+        assert ht.length() == 0
+        assert len(ht.multipliers) == 2
+        assert len(CuckooHashTable(num_hashes=3).multipliers) == 3
+        # The same seed picks the same hash functions when rehashing
+        first, second = CuckooHashTable(seed=7), CuckooHashTable(seed=7)
+        first._rehash(8, reseed=True)
+        second._rehash(8, reseed=True)
+        assert first.multipliers == second.multipliers
+        with self.assertRaises(ValueError):
+            CuckooHashTable(num_hashes=1)
+
+    def test_set_and_get(self):
+        ht = CuckooHashTable()
+        ht.set('I', 1)
+        ht.set('V', 5)
+        ht.set('X', 10)
+        ht.set('V', 6)  # Update value
+        assert ht.get('I') == 1
+        assert ht.get('V') == 6
+        assert ht.get('X') == 10
+        assert ht.size == 3
+        assert ht.contains('X') is True
+        assert ht.contains('A') is False
+        self.assertCountEqual(ht.items(), [('I', 1), ('V', 6), ('X', 10)])
+        with self.assertRaises(KeyError):
+            ht.get('A')  # Key does not exist
+
+    def test_keys_stay_in_their_slots(self):
+        ht = CuckooHashTable(num_hashes=3)
+        for number in range(1000):
+            ht.set(number, number)
+        for number in range(1000):
+            # Every key is in one of the slots its hash functions pick
+            index = ht._find_slot(number)
+            assert index in ht._slots(hash(number))
+            assert ht.buckets[index] == (number, number)
+        assert ht.stash == []
+
+    def test_resize(self):
+        ht = CuckooHashTable(8)
+        for number in range(4):
+            ht.set(number, number)
+        assert len(ht.buckets) == 8
+        ht.set(4, 4)  # Load factor 5/8 should trigger resize
+        assert len(ht.buckets) == 16
+        for number in range(5):
+            assert ht.get(number) == number
+
+    def test_delete(self):
+        ht = CuckooHashTable()
+        for key in ('I', 'V', 'X'):
+            ht.set(key, key.lower())
+        ht.delete('V')
+        assert ht.contains('V') is False
+        assert ht.size == 2
+        with self.assertRaises(KeyError):
+            ht.delete('V')  # Key no longer exists
+        self.assertCountEqual(ht.keys(), ['I', 'X'])
+
+    def test_colliding_hash_codes(self):
+        class Key(object):
+            def __init__(self, name):
+                self.name = name
+
+            def __hash__(self):
+                return 42
+
+            def __eq__(self, other):
+                return self.name == other.name
+
+        # Seeded, so the new hash functions are the same on every run
+        ht = CuckooHashTable(seed=1)
+        # Only two keys with the same hash code fit in their two slots
+        for name in 'abcde':
+            ht.set(Key(name), name)
+        # The third one went around a cycle of evictions, so the table was
+        # rehashed with new hash functions, and the leftovers were stashed
+        assert ht.multipliers != CuckooHashTable.MULTIPLIERS[:2]
+        assert len(set(ht._slots(42))) == 2
+        assert len(ht.stash) == 3
+        for name in 'abcde':
+            assert ht.get(Key(name)) == name
+        ht.set(Key('e'), 'E')  # Update a stashed value
+        assert ht.get(Key('e')) == 'E'
+        ht.delete(Key('e'))
+        assert ht.contains(Key('e')) is False
+        assert ht.size == 4
+        assert len(ht.items()) == 4
+
+    def test_many_entries(self):
+        ht = CuckooHashTable(hasher=SipHasher())
+        keys = ['route-{}'.format(number) for number in range(5000)]
+        for key in keys:
+            ht.set(key, key.upper())
+        for key in keys[::3]:
+            ht.delete(key)
+        for index, key in enumerate(keys):
+            assert ht.contains(key) is (index % 3 != 0)
+        assert ht.size == 3333
+
+
+class OrderedHashTableTest(unittest.TestCase):
+
+    def test_unsigned_64_bit_hasher(self):
+        # Hash codes of 2 ** 63 and up do not fit a signed array('q')
+        def hasher(key):
+            return fnv1a_64(key_bytes(key))
+        assert hasher('route-1') >= 2 ** 63
+        ht = OrderedHashTable(hasher=hasher)
+        for number in range(100):
+            ht.set('route-{}'.format(number), number)
+        ht.set(2 ** 70, 'huge')
+        assert ht.get('route-1') == 1
+        assert ht.get(2 ** 70) == 'huge'
+        ht.delete('route-1')
+        assert ht.contains('route-1') is False
+        assert ht.length() == 100
+
+    def test_init(self):
+        ht = OrderedHashTable(4)
+        assert len(ht.indices) == 4
+        assert ht.indices.typecode == 'b'
+        assert ht.length() == 0
+        assert OrderedHashTable(1 << 16).indices.typecode == 'i'
+
+    def test_set_and_get(self):
+        ht = OrderedHashTable()
+        ht.set('I', 1)
+        ht.set('V', 5)
+        ht.set('X', 10)
+        ht.set('V', 6)  # Update value
+        assert ht.get('I') == 1
+        assert ht.get('V') == 6
+        assert ht.get('X') == 10
+        assert ht.size == 3
+        assert ht.contains('V') is True
+        assert ht.contains('A') is False
+        with self.assertRaises(KeyError):
+            ht.get('A')  # Key does not exist
+
+    def test_insertion_order(self):
+        ht = OrderedHashTable()
+        for key in ('X', 'I', 'V', 'L'):
+            ht.set(key, key.lower())
+        ht.set('I', 'one')  # Updating keeps the key's place
+        ht.delete('V')
+        ht.set('V', 'five')  # Inserting again puts the key last
+        assert ht.keys() == ['X', 'I', 'L', 'V']
+        assert ht.items() == [('X', 'x'), ('I', 'one'), ('L', 'l'),
+                              ('V', 'five')]
+
+    def test_order_kept_through_resize(self):
+        ht = OrderedHashTable(8)
+        keys = ['route-{}'.format(number) for number in range(100)]
+        for key in keys:
+            ht.set(key, key.upper())
+        for key in keys[::2]:
+            ht.delete(key)
+        assert len(ht.indices) == 128  # Shrunk back from 256
+        assert ht.indices.typecode == 'h'
+        assert ht.keys() == keys[1::2]
+        assert ht.values() == [key.upper() for key in keys[1::2]]
+
+    def test_delete(self):
+        ht = OrderedHashTable()
+        for key in ('I', 'V', 'X'):
+            ht.set(key, key.lower())
+        ht.delete('V')
+        assert ht.contains('V') is False
+        assert ht.size == 2
+        assert ht.deleted == 1
+        # The deleted entry stays in the dense arrays until a resize
+        assert len(ht.entry_keys) == 3
+        with self.assertRaises(KeyError):
+            ht.delete('V')  # Key no longer exists
+        assert ht.keys() == ['I', 'X']
+
+    def test_compacted_on_resize(self):
+        # Never compact on delete, only when the used slots fill up
+        ht = OrderedHashTable(8, policy=ResizePolicy(compact_at=1))
+        for number in range(5):
+            ht.set(number, number)
+        for number in range(4):
+            ht.delete(number)
+        ht.set(5, 5)
+        ht.set(6, 6)  # 7 of 8 slots used, but only 3 entries are live
+        assert len(ht.indices) == 8
+        assert ht.deleted == 0
+        assert len(ht.entry_keys) == 3
+        assert ht.items() == [(4, 4), (5, 5), (6, 6)]
+
+
+class SwissHashTableTest(unittest.TestCase):
+
+    def test_init(self):
+        ht = SwissHashTable(4)
+        assert len(ht.buckets) == 16  # At least one group
+        assert ht.control == bytearray([0x80] * 16)
+        assert ht.length() == 0
+        assert len(SwissHashTable(100).buckets) == 128
+        assert ht.probing == 'quadratic'
+
+    def test_never_shrinks_below_one_group(self):
+        ht = SwissHashTable(track_stats=True)
+        for number in range(4):
+            ht.set(number, number)
+        for number in range(3):
+            ht.delete(number)  # 1 entry in 16 slots is below shrink_at
+        assert len(ht.buckets) == 16
+        assert ht.stats()['resizes'] == 0
+        # A policy with a smaller minimum is copied with one group instead
+        policy = ResizePolicy(grow_at=0.5, shrink_at=0.1, factor=4)
+        ht = SwissHashTable(16, policy=policy)
+        assert ht.policy.min_size == 16
+        assert (ht.policy.grow_at, ht.policy.shrink_at,
+                ht.policy.factor) == (0.5, 0.1, 4)
+        assert policy.min_size == 8  # Left unchanged
+
+    def test_probing_strategies(self):
+        # Takes its arguments in the same order as HashTableProbing
+        policy = ResizePolicy(grow_at=0.5, min_size=16)
+        ht = SwissHashTable(8, 'linear', policy)
+        assert ht.probing == 'linear'
+        assert ht.policy is policy
+        with self.assertRaises(ValueError):
+            SwissHashTable(8, 'cubic')
+        for probing in ('linear', 'quadratic', 'double'):
+            ht = SwissHashTable(64, probing)
+            # Every group is visited once, from the home group
+            starts = list(ht._groups(0x1234567))
+            assert sorted(starts) == list(range(0, 64, 16))
+            assert starts[0] == ((0x1234567 >> 7) & 3) * 16
+            for number in range(500):
+                ht.set(number, number)
+            assert all(ht.get(number) == number for number in range(500))
+
+    def test_set_and_get(self):
+        ht = SwissHashTable()
+        ht.set('I', 1)
+        ht.set('V', 5)
+        ht.set('X', 10)
+        ht.set('V', 6)  # Update value
+        assert ht.get('I') == 1
+        assert ht.get('V') == 6
+        assert ht.get('X') == 10
+        assert ht.size == 3
+        assert ht.contains('X') is True
+        assert ht.contains('A') is False
+        self.assertCountEqual(ht.items(), [('I', 1), ('V', 6), ('X', 10)])
+        with self.assertRaises(KeyError):
+            ht.get('A')  # Key does not exist
+
+    def test_control_bytes_hold_hash_bits(self):
+        ht = SwissHashTable(32)
+        ht.set(0x1ff, 'a')  # Home group 3 & 1, tag 0x7f
+        assert ht.control[16] == 0x7f
+        assert ht.buckets[16] == (0x1ff, 'a')
+
+    def test_overflow_into_next_group(self):
+        ht = SwissHashTable(64, track_stats=True)
+        # These 20 keys share home group 0, so 4 spill into group 1
+        keys = [number << 9 for number in range(20)]
+        for key in keys:
+            ht.set(key, key)
+        assert ht.control[:16].count(0x80) == 0
+        assert ht.control[16:32].count(0x80) == 12
+        for key in keys:
+            assert ht.get(key) == key
+        assert ht.stats()['collisions'] == 4
+        # Deleting from a full group leaves a tombstone, so the keys that
+        # spilled over can still be found
+        ht.delete(keys[0])
+        assert ht.control[0] == 0xfe
+        assert ht.get(keys[19]) == keys[19]
+        # A group with an empty slot was never probed past
+        ht.delete(keys[19])
+        assert ht.control.count(0xfe) == 1
+
+    def test_delete_and_compact(self):
+        ht = SwissHashTable(64)
+        for number in range(50):
+            ht.set(number << 9, number)  # All in home group 0
+        for number in range(16):
+            ht.delete(number << 9)
+        assert ht.deleted == 16
+        ht.delete(16 << 9)  # More than a quarter of the slots are tombstones
+        assert ht.deleted == 0
+        assert ht.size == 33
+        for number in range(17, 50):
+            assert ht.get(number << 9) == number
+
+    def test_many_entries(self):
+        ht = SwissHashTable(hasher=SipHasher())
+        keys = ['route-{}'.format(number) for number in range(5000)]
+        for key in keys:
+            ht.set(key, key.upper())
+        for key in keys[::3]:
+            ht.delete(key)
+        for index, key in enumerate(keys):
+            assert ht.contains(key) is (index % 3 != 0)
+        assert ht.size == 3333
+        assert ht.load_factor() <= 0.875
+
+
+class CompactHashTableTest(unittest.TestCase):
+
+    def test_unsigned_64_bit_hasher(self):
+        # Hash codes of 2 ** 63 and up do not fit a signed array('q')
+        def hasher(key):
+            return fnv1a_64(key_bytes(key))
+        assert hasher('route-1') >= 2 ** 63
+        ht = CompactHashTable(hasher=hasher)
+        for number in range(100):
+            ht.set('route-{}'.format(number), number)
+        ht.set(2 ** 70, 'huge')
+        assert ht.get('route-1') == 1
+        assert ht.get(2 ** 70) == 'huge'
+        ht.delete('route-1')
+        assert ht.contains('route-1') is False
+        assert ht.length() == 100
+
+    def test_init(self):
+        ht = CompactHashTable(4)
+        assert len(ht.slot_keys) == 4
+        assert len(ht.hashes) == 4
+        assert ht.length() == 0
+        assert ht.items() == []
+
+    def test_set_and_get(self):
+        ht = CompactHashTable()
+        ht.set('I', 1)
+        ht.set('V', 5)
+        ht.set(None, 0)  # None is a valid key
+        ht.set('V', 6)  # Update value
+        assert ht.get('I') == 1
+        assert ht.get('V') == 6
+        assert ht.get(None) == 0
+        assert ht.size == 3
+        self.assertCountEqual(ht.keys(), ['I', 'V', None])
+        self.assertCountEqual(ht.values(), [1, 6, 0])
+        with self.assertRaises(KeyError):
+            ht.get('A')  # Key does not exist
+
+    def test_delete_and_resize(self):
+        ht = CompactHashTable(4, probing='quadratic')
+        keys = ['route-{}'.format(number) for number in range(100)]
+        for key in keys:
+            ht.set(key, len(key))
+        assert len(ht.slot_keys) == 256
+        for key in keys[:50]:
+            ht.delete(key)
+        assert ht.size == 50
+        for key in keys[:50]:
+            assert ht.contains(key) is False
+        for key in keys[50:]:
+            assert ht.get(key) == len(key)
+        with self.assertRaises(KeyError):
+            ht.delete(keys[0])  # Key no longer exists
+
+    def test_memory_usage(self):
+        items = [('route-{}'.format(number), number)
+                 for number in range(1000)]
+        report = dict(compare_memory_usage(items))
+        self.assertCountEqual(report.keys(), ['HashTable', 'HashTableProbing',
+                                              'CompactHashTable',
+                                              'OrderedHashTable'])
+        assert report['OrderedHashTable'] < report['CompactHashTable']
+        assert report['CompactHashTable'] < report['HashTableProbing']
+        assert report['HashTableProbing'] < report['HashTable']
+
 
 if __name__ == '__main__':
     unittest.main()
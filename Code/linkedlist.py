@@ -2,6 +2,9 @@
 
 
 class Node(object):
+    # Store the attributes in fixed slots rather than a dictionary per node,
+    # which would take more memory than the node itself
+    __slots__ = ('data', 'next')
 
     def __init__(self, data):
         """Initialize this node with the given data."""
@@ -14,6 +17,8 @@ class Node(object):
 
 
 class LinkedList(object):
+    # A hash table holds one of these per bucket, so keep them small too
+    __slots__ = ('head', 'tail', 'size')
 
     def __init__(self, iterable=None):
         """Initialize this linked list and append the given items, if any."""
@@ -22,8 +27,7 @@ class LinkedList(object):
         self.size = 0  # Number of nodes
         # Append the given items
         if iterable is not None:
-            for item in iterable:
-                self.append(item)
+            self.extend(iterable)
 
     def __str__(self):
         """Return a formatted string representation of this linked list."""
@@ -199,6 +203,150 @@ class LinkedList(object):
         # Increment the size property
         self.size += 1
 
+    def pop_front(self):
+        """Remove and return the item at the head of this linked list, or
+           raise ValueError if it is empty.
+
+           Best and worst case running time: O(1)
+           Unlike delete, this never compares items, so it always removes the
+           head node, without searching for a node with an equal item.
+
+        """
+        if self.is_empty():
+            raise ValueError('List is empty')
+        node = self.head
+        # Update head to the next node, and tail too if that empties the list
+        self.head = node.next
+        if self.head is None:
+            self.tail = None
+        node.next = None
+        self.size -= 1
+        return node.data
+
+    def _node_at_index(self, index):
+        """Return the node at the given index, which must be in range."""
+        node = self.head
+        for i in range(index):
+            node = node.next
+        return node
+
+    def _take_nodes(self, other):
+        """Empty the given list, whose nodes now belong to this one."""
+        other.head = None
+        other.tail = None
+        other.size = 0
+
+    def extend(self, iterable):
+        """Insert the given items at the tail of this linked list, in order.
+
+           Best and worst case running time: O(k) for k given items. The new
+           nodes are linked to each other first, then to the tail all at
+           once, so size is updated once rather than per item. This also
+           makes extending a list with itself safe, since the items are read
+           before any are linked in.
+
+        """
+        head = None
+        tail = None
+        count = 0
+        for item in iterable:
+            node = Node(item)
+            if head is None:
+                head = node
+            else:
+                tail.next = node
+            tail = node
+            count += 1
+        if head is None:
+            return None
+        if self.is_empty():
+            self.head = head
+        else:
+            self.tail.next = head
+        self.tail = tail
+        self.size += count
+
+    def concat(self, other):
+        """Move all nodes of the given linked list to the tail of this one,
+           leaving the other list empty, or raise ValueError if it is this
+           list.
+
+           Best and worst case running time: O(1), since we only link our
+           tail to its head, and add its size to ours, without visiting or
+           copying any of its nodes.
+
+        """
+        if other is self:
+            raise ValueError('Cannot link a list into itself')
+        if other.is_empty():
+            return None
+        if self.is_empty():
+            self.head = other.head
+        else:
+            self.tail.next = other.head
+        self.tail = other.tail
+        self.size += other.size
+        self._take_nodes(other)
+
+    def splice(self, index, other):
+        """Move all nodes of the given linked list into this one, so its head
+           ends up at the given index, leaving the other list empty. Raise
+           ValueError if the index is out of range of the list size, or the
+           other list is this list.
+
+           Best case running time: O(1) at either end of the list.
+
+           Worst case running time: O(index), only to find the node before
+           the index. The other list's nodes are linked in as one chain, so
+           its length does not matter.
+
+        """
+        if not (0 <= index <= self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        if index == self.size or other.is_empty():
+            self.concat(other)
+            return None
+        if other is self:
+            raise ValueError('Cannot link a list into itself')
+        if index == 0:
+            other.tail.next = self.head
+            self.head = other.head
+        else:
+            previous = self._node_at_index(index - 1)
+            other.tail.next = previous.next
+            previous.next = other.head
+        self.size += other.size
+        self._take_nodes(other)
+
+    def split_at(self, index):
+        """Remove the nodes from the given index to the tail of this linked
+           list, and return them as a new list of the same type, or raise
+           ValueError if the index is out of range of the list size.
+
+           Best case running time: O(1) at either end of the list.
+
+           Worst case running time: O(index), only to find the node before
+           the index. The new list's size is what remains of ours, so its
+           nodes are never counted.
+
+        """
+        if not (0 <= index <= self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        rest = type(self)()
+        if index == self.size:
+            return rest
+        if index == 0:
+            rest.concat(self)
+            return rest
+        previous = self._node_at_index(index - 1)
+        rest.head = previous.next
+        rest.tail = self.tail
+        rest.size = self.size - index
+        previous.next = None
+        self.tail = previous
+        self.size = index
+        return rest
+
     def find(self, quality):
         """Return an item from this linked list satisfying the given quality.
 
@@ -332,6 +480,279 @@ class LinkedList(object):
             yield(item)
 
 
+class DoublyNode(Node):
+    # A node that also links back to the node before it
+    __slots__ = ('prev',)
+
+    def __init__(self, data):
+        """Initialize this node with the given data."""
+        super(DoublyNode, self).__init__(data)
+        self.prev = None
+
+    def __repr__(self):
+        """Return a string representation of this node."""
+        return 'DoublyNode({!r})'.format(self.data)
+
+
+class DoublyLinkedList(LinkedList):
+    '''A linked list whose nodes link to both their neighbours, so that a
+       node can be removed, and the tail popped, without searching for the
+       node before it.
+
+       Inserting methods return the new node, which can later be given to
+       remove_node as a handle, to remove that very node in O(1) time, even
+       if other nodes hold equal items.
+    '''
+    __slots__ = ()
+
+    def __repr__(self):
+        """Return a string representation of this linked list."""
+        return 'DoublyLinkedList({!r})'.format(self.items())
+
+    def get_at_index(self, index):
+        """Return the item at the given index in this linked list, or
+           raise ValueError if the given index is out of range of the list
+           size.
+
+           Best case running time: O(1) at either end of the list.
+
+           Worst case running time: O(n) in the middle of the list, though we
+           walk from whichever end is closer, so at most n/2 nodes.
+
+        """
+        if not (0 <= index < self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        return self._node_at_index(index).data
+
+    def _node_at_index(self, index):
+        """Return the node at the given index, which must be in range."""
+        if index < self.size // 2:
+            node = self.head
+            for i in range(index):
+                node = node.next
+        else:
+            node = self.tail
+            for i in range(self.size - 1 - index):
+                node = node.prev
+        return node
+
+    def insert_at_index(self, index, item):
+        """Insert the given item at the given index in this linked list, and
+           return its node, or raise ValueError if the given index is out of
+           range of the list size.
+
+           Best case running time: O(1) at either end of the list.
+
+           Worst case running time: O(n) in the middle of the list.
+
+        """
+        if not (0 <= index <= self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        if index == self.size:
+            return self.append(item)
+        node = self._node_at_index(index)
+        new_node = DoublyNode(item)
+        new_node.prev = node.prev
+        new_node.next = node
+        if node.prev is None:
+            self.head = new_node
+        else:
+            node.prev.next = new_node
+        node.prev = new_node
+        self.size += 1
+        return new_node
+
+    def append(self, item):
+        """Insert the given item at the tail of this linked list, and return
+           its node.
+
+           Best and worst case running time: O(1)
+
+        """
+        return self.append_node(DoublyNode(item))
+
+    def append_node(self, node):
+        """Link the given node, which must not be in any list, at the tail of
+           this linked list, and return it.
+
+           Best and worst case running time: O(1)
+
+        """
+        node.prev = self.tail
+        node.next = None
+        if self.is_empty():
+            self.head = node
+        else:
+            self.tail.next = node
+        self.tail = node
+        self.size += 1
+        return node
+
+    def prepend(self, item):
+        """Insert the given item at the head of this linked list, and return
+           its node.
+
+           Best and worst case running time: O(1)
+
+        """
+        node = DoublyNode(item)
+        node.next = self.head
+        if self.is_empty():
+            self.tail = node
+        else:
+            self.head.prev = node
+        self.head = node
+        self.size += 1
+        return node
+
+    def extend(self, iterable):
+        """Insert the given items at the tail of this linked list, in order.
+
+           Best and worst case running time: O(k) for k given items, which
+           are read before any are linked in, in case they come from this
+           list.
+
+        """
+        for item in list(iterable):
+            self.append(item)
+
+    def _check_doubly(self, other):
+        """Raise TypeError unless the given list links its nodes both ways."""
+        if not isinstance(other, DoublyLinkedList):
+            raise TypeError('Expected a DoublyLinkedList: '
+                            '{}'.format(type(other).__name__))
+
+    def concat(self, other):
+        """Move all nodes of the given doubly linked list to the tail of this
+           one, leaving the other list empty. Raise TypeError if its nodes do
+           not link back, or ValueError if it is this list.
+
+           Best and worst case running time: O(1)
+
+        """
+        self._check_doubly(other)
+        tail = self.tail
+        head = other.head
+        super(DoublyLinkedList, self).concat(other)
+        if head is not None:
+            head.prev = tail
+
+    def splice(self, index, other):
+        """Move all nodes of the given doubly linked list into this one, so
+           its head ends up at the given index, leaving the other list empty.
+           Raise TypeError if its nodes do not link back, or ValueError if
+           the index is out of range or the other list is this list.
+
+           Best case running time: O(1) at either end of the list.
+
+           Worst case running time: O(n) in the middle of the list, though we
+           walk from whichever end is closer, so at most n/2 nodes.
+
+        """
+        self._check_doubly(other)
+        if not (0 <= index <= self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        if index == self.size or other.is_empty():
+            self.concat(other)
+            return None
+        if other is self:
+            raise ValueError('Cannot link a list into itself')
+        node = self._node_at_index(index)
+        other.head.prev = node.prev
+        other.tail.next = node
+        if node.prev is None:
+            self.head = other.head
+        else:
+            node.prev.next = other.head
+        node.prev = other.tail
+        self.size += other.size
+        self._take_nodes(other)
+
+    def split_at(self, index):
+        """Remove the nodes from the given index to the tail of this linked
+           list, and return them as a new doubly linked list, or raise
+           ValueError if the index is out of range of the list size.
+
+           Best case running time: O(1) at either end of the list.
+
+           Worst case running time: O(n) in the middle of the list, though we
+           walk from whichever end is closer, so at most n/2 nodes.
+
+        """
+        rest = super(DoublyLinkedList, self).split_at(index)
+        if rest.head is not None:
+            rest.head.prev = None
+        return rest
+
+    def remove_node(self, node):
+        """Remove the given node from this linked list, or raise ValueError if
+           it is not linked into it, such as a handle that was already
+           removed.
+
+           Best and worst case running time: O(1), since the node knows both
+           of its neighbours, and they are all that need relinking.
+
+        """
+        if ((node.prev is None and self.head is not node) or
+                (node.next is None and self.tail is not node)):
+            raise ValueError('Node not in list: {!r}'.format(node))
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+        node.prev = node.next = None
+        self.size -= 1
+
+    def pop_front(self):
+        """Remove and return the item at the head of this linked list, or
+           raise ValueError if it is empty.
+
+           Best and worst case running time: O(1)
+
+        """
+        if self.is_empty():
+            raise ValueError('List is empty')
+        node = self.head
+        self.remove_node(node)
+        return node.data
+
+    def pop_back(self):
+        """Remove and return the item at the tail of this linked list, or
+           raise ValueError if it is empty.
+
+           Best and worst case running time: O(1), because the tail links to
+           the node before it, so we need not walk the list to find it.
+
+        """
+        if self.is_empty():
+            raise ValueError('List is empty')
+        node = self.tail
+        self.remove_node(node)
+        return node.data
+
+    def delete(self, item):
+        """Delete the first node holding the given item from this linked
+           list, or raise ValueError.
+
+           Best case running time: O(1) if the item is near the head.
+
+           Worst case running time: O(n) to search for the item, though once
+           found, its node is removed in O(1) time.
+
+        """
+        node = self.head
+        while node is not None:
+            if node.data == item:
+                self.remove_node(node)
+                return None
+            node = node.next
+        raise ValueError('Item not found: {}'.format(item))
+
+
 def test_linked_list():
     ll = LinkedList()
     print(ll)
@@ -1,6 +1,6 @@
 #!python
 
-from linkedlist import LinkedList, Node
+from linkedlist import LinkedList, Node, DoublyLinkedList, DoublyNode
 import unittest
 
 
@@ -12,6 +12,12 @@ class NodeTest(unittest.TestCase):
         assert node.data is data
         assert node.next is None
 
+    def test_slots(self):
+        node = Node('ABC')
+        assert not hasattr(node, '__dict__')
+        with self.assertRaises(AttributeError):
+            node.prev = None  # Not one of its slots
+
 
 class LinkedListTest(unittest.TestCase):
 
@@ -177,6 +183,244 @@ class LinkedListTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             ll.delete('X')  # item not in list
 
+    def test_pop_front(self):
+        ll = LinkedList(['A', 'B'])
+        assert ll.pop_front() == 'A'
+        assert ll.head.data == 'B'
+        assert ll.size == 1
+        assert ll.pop_front() == 'B'
+        assert ll.head is None
+        assert ll.tail is None
+        with self.assertRaises(ValueError):
+            ll.pop_front()  # list is empty
+        # NaN is not equal to itself, so delete could never find it
+        nan = float('nan')
+        ll = LinkedList([nan, 'B'])
+        assert ll.pop_front() is nan
+        assert ll.items() == ['B']
+
+    def test_extend(self):
+        ll = LinkedList(['A'])
+        ll.extend(['B', 'C'])
+        assert ll.items() == ['A', 'B', 'C']
+        assert ll.tail.data == 'C'
+        assert ll.size == 3
+        ll.extend([])
+        assert ll.size == 3
+        ll.extend(ll)  # Reads the items before linking any in
+        assert ll.items() == ['A', 'B', 'C', 'A', 'B', 'C']
+        assert ll.size == 6
+        ll = LinkedList()
+        ll.extend(iter('AB'))
+        assert ll.head.data == 'A'
+        assert ll.tail.data == 'B'
+
+    def test_concat(self):
+        ll = LinkedList(['A', 'B'])
+        other = LinkedList(['C', 'D'])
+        tail = other.tail
+        ll.concat(other)
+        assert ll.items() == ['A', 'B', 'C', 'D']
+        assert ll.tail is tail  # The same nodes, not copies
+        assert ll.size == 4
+        assert other.is_empty() is True
+        assert other.tail is None
+        assert other.size == 0
+        ll.concat(LinkedList())
+        assert ll.size == 4
+        empty = LinkedList()
+        empty.concat(ll)
+        assert empty.items() == ['A', 'B', 'C', 'D']
+        assert empty.head.data == 'A'
+        with self.assertRaises(ValueError):
+            empty.concat(empty)  # would link the tail to its own head
+        assert empty.tail.next is None
+
+    def test_splice(self):
+        ll = LinkedList(['A', 'D'])
+        ll.splice(1, LinkedList(['B', 'C']))
+        assert ll.items() == ['A', 'B', 'C', 'D']
+        ll.splice(0, LinkedList(['0']))
+        ll.splice(5, LinkedList(['E']))
+        assert ll.items() == ['0', 'A', 'B', 'C', 'D', 'E']
+        assert ll.head.data == '0'
+        assert ll.tail.data == 'E'
+        assert ll.size == 6
+        other = LinkedList(['X'])
+        with self.assertRaises(ValueError):
+            ll.splice(7, other)  # index out of range
+        assert other.items() == ['X']
+        with self.assertRaises(ValueError):
+            ll.splice(1, ll)
+
+    def test_split_at(self):
+        ll = LinkedList(['A', 'B', 'C', 'D'])
+        rest = ll.split_at(2)
+        assert ll.items() == ['A', 'B']
+        assert ll.tail.data == 'B'
+        assert ll.tail.next is None
+        assert ll.size == 2
+        assert rest.items() == ['C', 'D']
+        assert rest.tail.data == 'D'
+        assert rest.size == 2
+        assert ll.split_at(2).is_empty() is True
+        rest = ll.split_at(0)
+        assert rest.items() == ['A', 'B']
+        assert ll.is_empty() is True
+        assert ll.tail is None
+        with self.assertRaises(ValueError):
+            ll.split_at(1)  # index out of range
+
+
+class DoublyLinkedListTest(unittest.TestCase):
+
+    def assert_links(self, ll):
+        """Check that the prev links mirror the next links."""
+        previous = None
+        node = ll.head
+        while node is not None:
+            assert node.prev is previous
+            previous, node = node, node.next
+        assert ll.tail is previous
+
+    def test_init_with_list(self):
+        ll = DoublyLinkedList(['A', 'B', 'C'])
+        assert isinstance(ll.head, DoublyNode)
+        assert ll.items() == ['A', 'B', 'C']
+        assert ll.size == 3
+        self.assert_links(ll)
+
+    def test_append_and_prepend_return_nodes(self):
+        ll = DoublyLinkedList()
+        node = ll.append('B')
+        assert node.data == 'B'
+        assert ll.prepend('A').next is node
+        assert ll.append('C').prev is node
+        assert ll.items() == ['A', 'B', 'C']
+        self.assert_links(ll)
+
+    def test_pop_front_and_back(self):
+        ll = DoublyLinkedList(['A', 'B', 'C'])
+        assert ll.pop_back() == 'C'
+        assert ll.pop_front() == 'A'
+        assert ll.items() == ['B']
+        self.assert_links(ll)
+        assert ll.pop_back() == 'B'
+        assert ll.head is None
+        assert ll.tail is None
+        with self.assertRaises(ValueError):
+            ll.pop_back()  # list is empty
+        with self.assertRaises(ValueError):
+            ll.pop_front()  # list is empty
+
+    def test_remove_node(self):
+        ll = DoublyLinkedList()
+        first = ll.append('A')
+        duplicate = ll.append('A')
+        last = ll.append('B')
+        ll.remove_node(duplicate)  # The very node, not the first equal one
+        assert ll.head is first
+        assert ll.items() == ['A', 'B']
+        self.assert_links(ll)
+        ll.remove_node(last)
+        ll.remove_node(first)
+        assert ll.is_empty() is True
+        assert ll.size == 0
+        assert ll.tail is None
+
+    def test_remove_stale_node(self):
+        ll = DoublyLinkedList(['A', 'B', 'C'])
+        node = ll.append('D')
+        ll.remove_node(node)
+        with self.assertRaises(ValueError):
+            ll.remove_node(node)  # Already removed
+        assert ll.items() == ['A', 'B', 'C']
+        assert ll.size == 3
+        self.assert_links(ll)
+        with self.assertRaises(ValueError):
+            ll.remove_node(DoublyLinkedList(['A']).head)  # In another list
+        assert ll.pop_front() == 'A'
+        assert ll.items() == ['B', 'C']
+
+    def test_move_node(self):
+        ll = DoublyLinkedList(['A', 'B', 'C'])
+        node = ll.head
+        ll.remove_node(node)
+        assert ll.append_node(node) is node
+        assert ll.items() == ['B', 'C', 'A']
+        self.assert_links(ll)
+
+    def test_get_and_insert_at_index(self):
+        ll = DoublyLinkedList(['A', 'C', 'E'])
+        assert ll.insert_at_index(1, 'B').data == 'B'
+        ll.insert_at_index(3, 'D')
+        ll.insert_at_index(0, '0')
+        ll.insert_at_index(6, 'F')
+        assert ll.items() == ['0', 'A', 'B', 'C', 'D', 'E', 'F']
+        self.assert_links(ll)
+        for index, item in enumerate(ll.items()):
+            assert ll.get_at_index(index) == item
+        with self.assertRaises(ValueError):
+            ll.get_at_index(7)
+        with self.assertRaises(ValueError):
+            ll.insert_at_index(8, 'X')
+
+    def test_delete(self):
+        ll = DoublyLinkedList(['A', 'B', 'C'])
+        ll.delete('B')
+        assert ll.items() == ['A', 'C']
+        ll.delete('C')
+        assert ll.tail.data == 'A'
+        self.assert_links(ll)
+        with self.assertRaises(ValueError):
+            ll.delete('X')  # item not in list
+
+    def test_extend(self):
+        ll = DoublyLinkedList(['A'])
+        ll.extend(ll)
+        ll.extend(['B'])
+        assert ll.items() == ['A', 'A', 'B']
+        self.assert_links(ll)
+
+    def test_concat(self):
+        ll = DoublyLinkedList(['A', 'B'])
+        other = DoublyLinkedList(['C', 'D'])
+        ll.concat(other)
+        assert ll.items() == ['A', 'B', 'C', 'D']
+        assert ll.size == 4
+        assert other.is_empty() is True
+        self.assert_links(ll)
+        empty = DoublyLinkedList()
+        empty.concat(ll)
+        self.assert_links(empty)
+        with self.assertRaises(TypeError):
+            empty.concat(LinkedList(['X']))  # nodes without prev links
+
+    def test_splice(self):
+        ll = DoublyLinkedList(['A', 'B', 'E', 'F'])
+        ll.splice(2, DoublyLinkedList(['C', 'D']))
+        ll.splice(0, DoublyLinkedList(['0']))
+        ll.splice(7, DoublyLinkedList(['G']))
+        assert ll.items() == ['0', 'A', 'B', 'C', 'D', 'E', 'F', 'G']
+        assert ll.size == 8
+        self.assert_links(ll)
+        with self.assertRaises(ValueError):
+            ll.splice(9, DoublyLinkedList())
+
+    def test_split_at(self):
+        ll = DoublyLinkedList(['A', 'B', 'C', 'D', 'E'])
+        rest = ll.split_at(3)
+        assert isinstance(rest, DoublyLinkedList)
+        assert ll.items() == ['A', 'B', 'C']
+        assert rest.items() == ['D', 'E']
+        self.assert_links(ll)
+        self.assert_links(rest)
+        assert ll.pop_back() == 'C'
+        assert rest.pop_front() == 'D'
+        rest.concat(ll.split_at(0))
+        assert rest.items() == ['E', 'A', 'B']
+        self.assert_links(rest)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,326 @@
+#!python
+
+import mmap
+from multiprocessing import resource_tracker, shared_memory
+import pickle
+import struct
+from hashers import fnv1a_64
+
+
+# File layout: a header, then a power of two number of 16 byte slots holding
+# a 64-bit key hash and the offset of the entry's record (0 for empty), then
+# the records, each a key length, value length, key bytes and pickled value.
+_MAGIC = b'MAPHT001'
+_HEADER = struct.Struct('<8sQQ')  # magic, number of slots, number of entries
+_SLOT = struct.Struct('<QQ')  # key hash, record offset
+_RECORD = struct.Struct('<II')  # key length, value length
+
+
+def _encode_key(key):
+    """Return the given str, bytes or int key as bytes, tagged with its type
+       so that keys of different types never compare equal.
+    """
+    if isinstance(key, str):
+        return b's' + key.encode('utf-8')
+    if isinstance(key, bytes):
+        return b'b' + key
+    if isinstance(key, int) and not isinstance(key, bool):
+        return b'i' + str(key).encode('ascii')
+    raise TypeError('Key must be a str, bytes or int: {!r}'.format(key))
+
+
+def _decode_key(data):
+    """Return the key that was encoded as the given bytes."""
+    tag, body = data[:1], data[1:]
+    if tag == b's':
+        return body.decode('utf-8')
+    if tag == b'b':
+        return body
+    return int(body)
+
+
+def _pack(items):
+    """Return the bytes of a hash table holding the given key-value pairs, in
+       the layout described above. See MappedHashTable.write.
+    """
+    records = bytearray()
+    # The slot table lives in memory while we fill it: for each slot,
+    # the key hash, the record offset (relative to the records), and the
+    # encoded key, to spot repeated keys
+    entries = []
+    for key, value in items:
+        key_data = _encode_key(key)
+        value_data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        entries.append((fnv1a_64(key_data), key_data, len(records)))
+        records += _RECORD.pack(len(key_data), len(value_data))
+        records += key_data + value_data
+    num_slots = 8
+    while num_slots < 2 * len(entries):
+        num_slots *= 2
+    mask = num_slots - 1
+    slots = [None] * num_slots
+    num_entries = 0
+    for entry in entries:
+        index = entry[0] & mask
+        # Probe until we find an empty slot, or the same hash and key
+        while slots[index] is not None and slots[index][:2] != entry[:2]:
+            index = (index + 1) & mask
+        if slots[index] is None:
+            num_entries += 1
+        slots[index] = entry
+    records_offset = _HEADER.size + num_slots * _SLOT.size
+    table = bytearray(records_offset)
+    _HEADER.pack_into(table, 0, _MAGIC, num_slots, num_entries)
+    for index, entry in enumerate(slots):
+        if entry is not None:
+            _SLOT.pack_into(table, _HEADER.size + index * _SLOT.size,
+                            entry[0], records_offset + entry[2])
+    table += records
+    return table
+
+
+class MappedHashTable(object):
+    '''A read-only hash table stored in a file, which is memory-mapped rather
+       than read, so opening it takes constant time, and processes that open
+       the same file share its pages.
+    '''
+    def __init__(self, path):
+        """Open the hash table file at the given path, written by write."""
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        self._read_header(path)
+
+    def _read_header(self, source):
+        """Read the number of slots and entries from the header of the
+           mapped table, or close it and raise ValueError if the given source
+           does not hold a hash table.
+        """
+        magic, num_slots, num_entries = _HEADER.unpack_from(self.map, 0)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError('Not a hash table file: {}'.format(source))
+        self.num_slots = num_slots
+        self.size = num_entries  # Number of key-value entries
+
+    @staticmethod
+    def write(path, items):
+        """Write the given key-value pairs to a hash table file at the given
+           path. Keys must be str, bytes or int, and values can be anything
+           that pickle can save. If a key appears more than once, its last
+           value is kept.
+
+           Running time: O(n), with the slots sized for a load factor of at
+           most 0.5, so that lookups probe very few of them.
+
+        """
+        with open(path, 'wb') as file:
+            file.write(_pack(items))
+
+    def __enter__(self):
+        """Return this hash table, to be closed at the end of a with block."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close this hash table at the end of a with block."""
+        self.close()
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'MappedHashTable({!r})'.format(self.items())
+
+    def __len__(self):
+        """Return the number of key-value entries in this hash table."""
+        return self.size
+
+    def __iter__(self):
+        """Return a generator of the keys in this hash table."""
+        return self.iter_keys()
+
+    def __contains__(self, key):
+        """Return True if this hash table contains the given key, or False."""
+        return self.contains(key)
+
+    def __getitem__(self, key):
+        """Return the value associated with the given key, or raise KeyError.
+        """
+        return self.get(key)
+
+    def close(self):
+        """Unmap the file. The hash table cannot be used afterwards."""
+        self.view.release()
+        self.map.close()
+
+    def length(self):
+        """Return the number of key-value entries in this hash table."""
+        return self.size
+
+    def _find_record(self, key):
+        """Return the offset of the record for the given key, or None.
+
+           Average running time: O(1). The key bytes in the record are
+           compared through a memoryview of the map, so nothing is copied
+           out of the file unless the hashes match.
+
+        """
+        key_data = _encode_key(key)
+        hash_code = fnv1a_64(key_data)
+        mask = self.num_slots - 1
+        index = hash_code & mask
+        while True:
+            slot_hash, offset = _SLOT.unpack_from(
+                self.map, _HEADER.size + index * _SLOT.size)
+            if offset == 0:
+                return None
+            if slot_hash == hash_code:
+                key_length, value_length = _RECORD.unpack_from(self.map,
+                                                               offset)
+                start = offset + _RECORD.size
+                if self.view[start:start + key_length] == key_data:
+                    return offset
+            index = (index + 1) & mask
+
+    def _read_record(self, offset):
+        """Return the (key, value) pair stored in the record at the given
+           offset.
+        """
+        key_length, value_length = _RECORD.unpack_from(self.map, offset)
+        start = offset + _RECORD.size
+        key = _decode_key(bytes(self.view[start:start + key_length]))
+        start += key_length
+        value = pickle.loads(self.view[start:start + value_length])
+        return key, value
+
+    def contains(self, key):
+        """Return True if this hash table contains the given key, or False.
+
+           Average running time: O(1)
+
+        """
+        return self._find_record(key) is not None
+
+    def get(self, key):
+        """Return the value associated with the given key, or raise KeyError.
+
+           Average running time: O(1), plus the time to unpickle the value.
+
+        """
+        offset = self._find_record(key)
+        if offset is None:
+            raise KeyError('Key not found: {}'.format(key))
+        return self._read_record(offset)[1]
+
+    def iter_items(self):
+        """Return a generator of all entries (key-value pairs) in this hash
+           table.
+
+           Best and worst case running time: O(b) for b slots.
+
+        """
+        for index in range(self.num_slots):
+            slot_hash, offset = _SLOT.unpack_from(
+                self.map, _HEADER.size + index * _SLOT.size)
+            if offset != 0:
+                yield self._read_record(offset)
+
+    def iter_keys(self):
+        """Return a generator of all keys in this hash table."""
+        for key, value in self.iter_items():
+            yield key
+
+    def iter_values(self):
+        """Return a generator of all values in this hash table."""
+        for key, value in self.iter_items():
+            yield value
+
+    def keys(self):
+        """Return a list of all keys in this hash table."""
+        return list(self.iter_keys())
+
+    def values(self):
+        """Return a list of all values in this hash table."""
+        return list(self.iter_values())
+
+    def items(self):
+        """Return a list of all entries (key-value pairs) in this hash table.
+        """
+        return list(self.iter_items())
+
+
+def _attach_shared_memory(name):
+    """Return the existing shared memory block with the given name. The
+       block is not tracked, so it is not unlinked when a process that merely
+       attached to it exits.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python before 3.13 always tracks the block
+        shm = shared_memory.SharedMemory(name=name)
+        # Otherwise this process's resource tracker unlinks it at exit
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class SharedHashTable(MappedHashTable):
+    '''A read-only hash table stored in a block of shared memory, in the same
+       layout as a MappedHashTable file, so that any number of processes can
+       attach to the block by name and read one copy of the table.
+
+       The process that creates the table should unlink it once every
+       process is done with it. A SharedHashTable can be pickled, to pass it
+       to worker processes, which attach to the same block.
+    '''
+    def __init__(self, name):
+        """Attach to the shared memory block with the given name, holding a
+           hash table written by create.
+        """
+        self.shm = _attach_shared_memory(name)
+        self.map = self.view = self.shm.buf
+        self._read_header(name)
+
+    @classmethod
+    def create(cls, items, name=None):
+        """Return a new hash table holding the given key-value pairs, in a new
+           shared memory block with the given name (by default, a unique one).
+           Keys and values are as for MappedHashTable.write.
+
+           Running time: O(n), plus one copy of the table into the block.
+
+        """
+        data = _pack(items)
+        shm = shared_memory.SharedMemory(name=name, create=True,
+                                         size=len(data))
+        shm.buf[:len(data)] = data
+        table = cls.__new__(cls)
+        table.shm = shm
+        table.map = table.view = shm.buf
+        table._read_header(shm.name)
+        return table
+
+    def __reduce__(self):
+        """Pickle this hash table as the name of its shared memory block."""
+        return (type(self), (self.name,))
+
+    def __repr__(self):
+        """Return a string representation of this hash table."""
+        return 'SharedHashTable({!r})'.format(self.items())
+
+    @property
+    def name(self):
+        """The name other processes can attach to this hash table by."""
+        return self.shm.name
+
+    def close(self):
+        """Detach from the shared memory block. The hash table cannot be used
+           afterwards, but stays in shared memory until it is unlinked.
+        """
+        self.shm.close()
+
+    def unlink(self):
+        """Free the shared memory block, once every process has closed it."""
+        if getattr(self.shm, '_track', True):
+            # Unlinking a tracked block also unregisters it, which fails if
+            # an attach sharing this process's tracker already did, so make
+            # sure it is registered first (registering twice is harmless)
+            resource_tracker.register(self.shm._name, 'shared_memory')
+        self.shm.unlink()
@@ -0,0 +1,149 @@
+#!python
+
+from mappedhashtable import MappedHashTable, SharedHashTable
+from hashtable import HashTable
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+class MappedHashTableTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.path = os.path.join(directory, 'table.bin')
+
+    def tearDown(self):
+        os.remove(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+    def test_write_and_get(self):
+        ht = HashTable()
+        ht.set('I', 1)
+        ht.set('V', [5, 'five'])
+        ht.set(10, None)
+        ht.set(b'L', {'fifty': 50})
+        MappedHashTable.write(self.path, ht.iter_items())
+        with MappedHashTable(self.path) as mapped:
+            assert mapped.length() == 4
+            assert len(mapped) == 4
+            assert mapped.get('I') == 1
+            assert mapped.get('V') == [5, 'five']
+            assert mapped.get(10) is None
+            assert mapped[b'L'] == {'fifty': 50}
+            assert mapped.contains('I') is True
+            assert 'A' not in mapped
+            # Keys of different types are never equal
+            assert mapped.contains('10') is False
+            assert mapped.contains(b'I') is False
+            with self.assertRaises(KeyError):
+                mapped.get('A')  # Key does not exist
+            self.assertCountEqual(mapped.items(), ht.items())
+            self.assertCountEqual(mapped, ['I', 'V', 10, b'L'])
+
+    def test_many_entries(self):
+        items = [('route-{}'.format(number), number * 0.5)
+                 for number in range(5000)]
+        MappedHashTable.write(self.path, iter(items))
+        with MappedHashTable(self.path) as mapped:
+            assert mapped.num_slots == 16384
+            for key, value in items:
+                assert mapped.get(key) == value
+            assert mapped.contains('route-5000') is False
+
+    def test_repeated_keys_keep_last_value(self):
+        MappedHashTable.write(self.path, [('I', 1), ('V', 5), ('I', 2)])
+        with MappedHashTable(self.path) as mapped:
+            assert mapped.length() == 2
+            assert mapped.get('I') == 2
+
+    def test_empty_table(self):
+        MappedHashTable.write(self.path, [])
+        with MappedHashTable(self.path) as mapped:
+            assert mapped.length() == 0
+            assert mapped.items() == []
+            assert mapped.contains('I') is False
+
+    def test_unsupported_key(self):
+        with self.assertRaises(TypeError):
+            MappedHashTable.write(self.path, [((1, 2), 'tuple key')])
+        MappedHashTable.write(self.path, [('I', 1)])
+        with MappedHashTable(self.path) as mapped:
+            with self.assertRaises(TypeError):
+                mapped.get(1.5)
+
+    def test_not_a_hash_table_file(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'\0' * 64)
+        with self.assertRaises(ValueError):
+            MappedHashTable(self.path)
+
+
+def _get_in_worker(table, keys, connection):
+    """Send the values for the given keys back from a worker process."""
+    connection.send([table.get(key) for key in keys])
+    connection.close()
+
+
+class SharedHashTableTest(unittest.TestCase):
+
+    def setUp(self):
+        items = [('route-{}'.format(number), number * 0.5)
+                 for number in range(1000)]
+        self.table = SharedHashTable.create(items)
+
+    def tearDown(self):
+        self.table.close()
+        self.table.unlink()
+
+    def test_create_and_get(self):
+        assert self.table.length() == 1000
+        assert self.table.get('route-10') == 5.0
+        assert 'route-1000' not in self.table
+        with self.assertRaises(KeyError):
+            self.table.get('route-1000')  # Key does not exist
+
+    def test_attach_by_name(self):
+        attached = SharedHashTable(self.table.name)
+        try:
+            assert attached.length() == 1000
+            assert attached.get('route-999') == 499.5
+            self.assertCountEqual(attached.items(), self.table.items())
+        finally:
+            attached.close()
+
+    def test_read_from_other_processes(self):
+        keys = ['route-{}'.format(number) for number in range(0, 1000, 99)]
+        # Each worker unpickles the table by attaching to its block
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        worker = multiprocessing.get_context('spawn').Process(
+            target=_get_in_worker, args=(self.table, keys, sender))
+        worker.start()
+        values = receiver.recv()
+        worker.join()
+        assert values == [number * 0.5 for number in range(0, 1000, 99)]
+
+    def test_block_outlives_independent_readers(self):
+        # A separate program, with its own resource tracker, attaches to the
+        # block by name, reads it, and exits without unlinking it
+        script = ('import sys\n'
+                  'from mappedhashtable import SharedHashTable\n'
+                  'table = SharedHashTable(sys.argv[1])\n'
+                  'print(table.get("route-10"))\n'
+                  'table.close()\n')
+        output = subprocess.check_output(
+            [sys.executable, '-c', script, self.table.name],
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert output.strip() == b'5.0'
+        attached = SharedHashTable(self.table.name)
+        try:
+            assert attached.get('route-999') == 499.5
+        finally:
+            attached.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#!python
+
+import tracemalloc
+from binarytree import BinarySearchTree
+from hashtable import HashTable
+from linkedlist import LinkedList
+from queue import LinkedQueue
+from set import Set
+from stack import LinkedStack
+from unrolledlinkedlist import UnrolledLinkedList
+
+
+def measure_memory(build):
+    """Return the number of bytes allocated by calling the given function
+       that is still in use by the object it returns, as traced by
+       tracemalloc, so that the instance dictionaries of every node are
+       counted, and not only what sys.getsizeof can see.
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        structure = build()
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    del structure
+    return used
+
+
+def linked_structures_report(num_items=100000):
+    """Return a list of (name, bytes per item) pairs, one for each structure
+       made of linked nodes, holding the given number of int items (or keys)
+       that already exist, so only the structure itself is measured.
+    """
+    items = list(range(num_items))
+    # Insert into the tree in an order that keeps it balanced
+    tree_order = sorted(items, key=lambda item: bin(item)[:1:-1])
+    structures = [
+        ('LinkedList', lambda: LinkedList(items)),
+        ('UnrolledLinkedList', lambda: UnrolledLinkedList(items)),
+        ('LinkedStack', lambda: LinkedStack(items)),
+        ('LinkedQueue', lambda: LinkedQueue(items)),
+        ('HashTable', lambda: HashTable.from_items(zip(items, items))),
+        ('Set', lambda: Set(items)),
+        ('BinarySearchTree', lambda: BinarySearchTree(tree_order)),
+    ]
+    return [(name, measure_memory(build) / num_items)
+            for name, build in structures]
+
+
+if __name__ == '__main__':
+    for name, bytes_per_item in linked_structures_report():
+        print('{:>18}: {:6.1f} bytes per item'.format(name, bytes_per_item))
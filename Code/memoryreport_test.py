@@ -0,0 +1,26 @@
+#!python
+
+from memoryreport import measure_memory, linked_structures_report
+import unittest
+
+
+class MemoryReportTest(unittest.TestCase):
+
+    def test_measure_memory(self):
+        used = measure_memory(lambda: [None] * 1000)
+        assert 8000 <= used < 9000
+
+    def test_linked_structures_report(self):
+        report = dict(linked_structures_report(1000))
+        self.assertCountEqual(report.keys(), [
+            'LinkedList', 'UnrolledLinkedList', 'LinkedStack', 'LinkedQueue',
+            'HashTable', 'Set', 'BinarySearchTree'])
+        # Slotted nodes have no dictionary, so a node takes only a few words
+        assert report['LinkedList'] <= 64
+        assert report['BinarySearchTree'] <= 64
+        # A node per 64 items takes less than a word more per item
+        assert report['UnrolledLinkedList'] <= 16
+
+
+if __name__ == '__main__':
+    unittest.main()
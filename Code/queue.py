@@ -61,9 +61,8 @@ class LinkedQueue(object):
         if self.is_empty() is True:
             raise ValueError('There are no items in this queue.')
         else:
-            front = self.front()
-            self.list.delete(front)
-            return front
+            # Unlink the head node, rather than search for an equal item
+            return self.list.pop_front()
 
 
 # Implement ArrayQueue below, then change the assignment at the bottom
@@ -1,6 +1,6 @@
 #!python
 
-from queue import Queue
+from queue import Queue, LinkedQueue
 import unittest
 
 
@@ -116,5 +116,20 @@ class DequeTest(unittest.TestCase):
         assert d.is_empty() is True
 
 
+class LinkedQueueTest(unittest.TestCase):
+
+    def test_dequeue_duplicates(self):
+        nan = float('nan')
+        q = LinkedQueue(['A', nan, 'A'])
+        assert q.dequeue() == 'A'
+        # NaN is not equal to itself, but is still taken off the front
+        assert q.dequeue() is nan
+        assert q.front() == 'A'
+        assert q.dequeue() == 'A'
+        assert q.is_empty() is True
+        with self.assertRaises(ValueError):
+            q.dequeue()
+
+
 if __name__ == '__main__':
     unittest.main()
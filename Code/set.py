@@ -69,15 +69,12 @@ class Set:
            runtime complexity of O(n1 + n2).
 
         """
-        # gather items from both SetTests
-        items_from_self = self.collection.keys()
-        items_from_other = other_set.collection.keys()
         # initialize a new Set object
         new_set = Set()
-        # add the items to the new set as appropiate
-        for item in items_from_self:
+        # add the items from both sets to the new set as appropiate
+        for item in self.collection.iter_keys():
             new_set.add(item)
-        for item in items_from_other:
+        for item in other_set.collection.iter_keys():
             if new_set.contains(item) is False:
                 new_set.add(item)
         return new_set
@@ -105,7 +102,7 @@ class Set:
             pull_from_set = other_set
             other_set = self
         # add the appropiate elememts into the set to be returned
-        for element in pull_from_set.collection.keys():
+        for element in pull_from_set.collection.iter_keys():
             if other_set.contains(element) is True:
                 return_set.add(element)
         return return_set
@@ -116,45 +113,37 @@ class Set:
            The runtime complexity of Set.difference is asymptotically
            determined by the list comprehension below. This operation filters
            out any elements in the set of self, if they are also found in the
-           set of other_set. If we represent the numbers of elements in self
-           and other_set using n1 and n2 respectively, then we can say that
-           this list comprehension is performing a linear search of n2
-           iterations, for each of its n1 iterations.
+           set of other_set. If we represent the number of elements in self
+           using n, then we can say that this list comprehension performs an
+           O(1) average time membership check of other_set, for each of its n
+           iterations.
 
-           Therefore we can conclude that the runtime of this method is
-           O(n1 * n2).
+           Therefore we can conclude that the runtime of this method is O(n).
 
         """
-        # store the elements found in both sets in separate lists
-        self_elem = self.collection.keys()
-        other_elem = other_set.collection.keys()
         # remove elements from the set of self, if they are found in other_set
         unique_elements = [
-            elem for elem in self_elem if elem not in other_elem
+            elem for elem in self.collection.iter_keys()
+            if other_set.contains(elem) is False
         ]
         # initialize a set to return
         return Set(unique_elements)
 
     def is_subset(self, other_set):
         """Returns a boolean for whether other_set is a subset of self.
-           Similar to the runtime of Set.union, the runtime of this method is
-           determined by having to store separate lists of the elements in
-           the self set and other_set. The numbers of elements in these sets
-           can be represented using the variables n1 and n2 respectively. Since
-           we iterate over the elements of these two
-           sets in two separate steps, we can add them up for an overall method
-           runtime complexity of O(n1 + n2).
+           The runtime of this method is determined by iterating over the
+           elements of other_set, whose number can be represented using the
+           variable n2, and checking for each one whether it is in self, which
+           takes O(1) time on average. This gives an overall method runtime
+           complexity of O(n2).
 
         """
-        # store the elements found in both sets in separate lists
-        self_elem = self.collection.keys()
-        other_elem = other_set.collection.keys()
-        # other_elem CANNOT be a subset if it's bigger
+        # other_set CANNOT be a subset if it's bigger
         if other_set.size > self.size:
             return False
         # iterate through the elements in other_set
-        for element in other_elem:
+        for element in other_set.collection.iter_keys():
             # check of they are present in the set of self
-            if element not in self_elem:
+            if self.contains(element) is False:
                 return False
         return True
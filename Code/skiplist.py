@@ -0,0 +1,272 @@
+#!python
+
+import random
+
+
+class SkipNode(object):
+    # A node links forward at each of its levels, and records how many items
+    # each link skips over, so positions can be counted along the way
+    __slots__ = ('data', 'next', 'width')
+
+    def __init__(self, data, num_levels):
+        """Initialize this node with the given data and number of levels."""
+        self.data = data
+        self.next = [None] * num_levels  # Next node at each level
+        self.width = [1] * num_levels  # Positions crossed by each link
+
+    def __repr__(self):
+        """Return a string representation of this node."""
+        return 'SkipNode({!r})'.format(self.data)
+
+
+class SkipList(object):
+    '''A sorted linked list with extra links that skip ahead over many nodes,
+       so that both searching for an item and finding the item at an index
+       take O(log n) expected time, instead of O(n).
+
+       Each node is given a random number of levels: all have level 0, and
+       each level above is kept by half the nodes of the level below. A
+       search starts on the top level, and drops down a level whenever the
+       next link would go too far.
+    '''
+    # Enough levels for a list of about 2 ** 32 items
+    MAX_LEVELS = 32
+
+    def __init__(self, iterable=None, seed=None):
+        """Initialize this skip list, with the given seed for its random
+           levels, and insert the given items, if any.
+        """
+        self.random = random.Random(seed)
+        # The head has every level, and links to the first node of each
+        self.head = SkipNode(None, self.MAX_LEVELS)
+        self.size = 0  # Number of items
+        if iterable is not None:
+            for item in iterable:
+                self.insert(item)
+
+    def __repr__(self):
+        """Return a string representation of this skip list."""
+        return 'SkipList({!r})'.format(self.items())
+
+    def __len__(self):
+        """Return the number of items in this skip list."""
+        return self.size
+
+    def __iter__(self):
+        """Return a generator of the items in this skip list, in order."""
+        node = self.head.next[0]
+        while node is not None:
+            yield node.data
+            node = node.next[0]
+
+    def __contains__(self, item):
+        """Return True if this skip list contains the given item, or False."""
+        return self.contains(item)
+
+    def items(self):
+        """Return a list of all items in this skip list, in order."""
+        return list(self)
+
+    def is_empty(self):
+        """Return True if this skip list is empty, or False."""
+        return self.size == 0
+
+    def length(self):
+        """Return the number of items in this skip list."""
+        return self.size
+
+    def _random_levels(self):
+        """Return a random number of levels for a new node: 1 with chance
+           1/2, 2 with chance 1/4, and so on.
+        """
+        levels = 1
+        while levels < self.MAX_LEVELS and self.random.random() < 0.5:
+            levels += 1
+        return levels
+
+    def _find_before(self, item):
+        """Return a list of the last node before the given item at each
+           level, and a list of the index just past each of those nodes.
+
+           Expected running time: O(log n), since each level holds about
+           half the nodes of the one below, and we only cross a couple of
+           them on each level before dropping down.
+
+        """
+        before = [None] * self.MAX_LEVELS
+        positions = [0] * self.MAX_LEVELS
+        node = self.head
+        position = 0
+        for level in reversed(range(self.MAX_LEVELS)):
+            while (node.next[level] is not None and
+                   node.next[level].data < item):
+                position += node.width[level]
+                node = node.next[level]
+            before[level] = node
+            positions[level] = position
+        return before, positions
+
+    def insert(self, item):
+        """Insert the given item in order, before any equal items.
+
+           Expected running time: O(log n)
+
+        """
+        before, positions = self._find_before(item)
+        new_node = SkipNode(item, self._random_levels())
+        # The new node takes this index, one past the node before it
+        index = positions[0]
+        for level in range(len(new_node.next)):
+            node = before[level]
+            new_node.next[level] = node.next[level]
+            node.next[level] = new_node
+            # Split the node's link at the new node, which adds one position
+            crossed = index - positions[level]
+            new_node.width[level] = node.width[level] - crossed
+            node.width[level] = crossed + 1
+        # Links over the new node now cross one more position
+        for level in range(len(new_node.next), self.MAX_LEVELS):
+            before[level].width[level] += 1
+        self.size += 1
+
+    def delete(self, item):
+        """Delete the first of the given item from this skip list, or raise
+           ValueError.
+
+           Expected running time: O(log n)
+
+        """
+        before, positions = self._find_before(item)
+        node = before[0].next[0]
+        if node is None or node.data != item:
+            raise ValueError('Item not found: {}'.format(item))
+        self._unlink(before, node)
+
+    def _unlink(self, before, node):
+        """Remove the given node, given the last node before it at each
+           level.
+        """
+        for level in range(len(node.next)):
+            before[level].next[level] = node.next[level]
+            before[level].width[level] += node.width[level] - 1
+        # Links over the node now cross one less position
+        for level in range(len(node.next), self.MAX_LEVELS):
+            before[level].width[level] -= 1
+        self.size -= 1
+
+    def contains(self, item):
+        """Return True if this skip list contains the given item, or False.
+
+           Expected running time: O(log n)
+
+        """
+        before, positions = self._find_before(item)
+        node = before[0].next[0]
+        return node is not None and node.data == item
+
+    def rank(self, item):
+        """Return the number of items in this skip list less than the given
+           item, which is the index it would be inserted at.
+
+           Expected running time: O(log n)
+
+        """
+        before, positions = self._find_before(item)
+        return positions[0]
+
+    def index(self, item):
+        """Return the index of the first of the given item in this skip list,
+           or raise ValueError.
+
+           Expected running time: O(log n)
+
+        """
+        before, positions = self._find_before(item)
+        node = before[0].next[0]
+        if node is None or node.data != item:
+            raise ValueError('Item not found: {}'.format(item))
+        return positions[0]
+
+    def _node_at_index(self, index):
+        """Return the node at the given index, which must be in range."""
+        node = self.head
+        # Positions count from the head, which is one before index 0
+        remaining = index + 1
+        for level in reversed(range(self.MAX_LEVELS)):
+            while (node.next[level] is not None and
+                   node.width[level] <= remaining):
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def get_at_index(self, index):
+        """Return the item at the given index in this skip list, or raise
+           ValueError if the given index is out of range.
+
+           Expected running time: O(log n), following the links whose widths
+           add up to the index, taking the longest ones first.
+
+        """
+        if not (0 <= index < self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        return self._node_at_index(index).data
+
+    def delete_at_index(self, index):
+        """Delete and return the item at the given index in this skip list,
+           or raise ValueError if the given index is out of range. Even among
+           equal items, it is the node at that index that is removed.
+
+           Expected running time: O(log n), following the links whose widths
+           add up to the index, as in get_at_index, and keeping the last node
+           before it at each level, to unlink it in the same pass.
+
+        """
+        if not (0 <= index < self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        before = [None] * self.MAX_LEVELS
+        node = self.head
+        # Stop one position short, at the node before the index
+        remaining = index
+        for level in reversed(range(self.MAX_LEVELS)):
+            while (node.next[level] is not None and
+                   node.width[level] <= remaining):
+                remaining -= node.width[level]
+                node = node.next[level]
+            before[level] = node
+        node = before[0].next[0]
+        self._unlink(before, node)
+        return node.data
+
+    def range(self, low=None, high=None):
+        """Return a generator of the items in this skip list that are at
+           least low and less than high, in order. Either bound may be None,
+           to leave that end open.
+
+           Expected running time: O(log n + k) for k items in the range,
+           since we search for the first one, then walk along level 0.
+
+        """
+        if low is None:
+            node = self.head.next[0]
+        else:
+            before, positions = self._find_before(low)
+            node = before[0].next[0]
+        while node is not None and (high is None or node.data < high):
+            yield node.data
+            node = node.next[0]
+
+    def slice(self, start, stop):
+        """Return a generator of the items at indexes from start up to but
+           not including stop, in order.
+
+           Expected running time: O(log n + k) for k items in the slice.
+
+        """
+        start = max(start, 0)
+        stop = min(stop, self.size)
+        if start >= stop:
+            return
+        node = self._node_at_index(start)
+        for i in range(stop - start):
+            yield node.data
+            node = node.next[0]
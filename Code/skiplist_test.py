@@ -0,0 +1,121 @@
+#!python
+
+from skiplist import SkipList
+import bisect
+import random
+import unittest
+
+
+class SkipListTest(unittest.TestCase):
+
+    def test_init(self):
+        sl = SkipList()
+        assert sl.length() == 0
+        assert sl.is_empty() is True
+        assert sl.items() == []
+
+    def test_init_with_list(self):
+        sl = SkipList(['C', 'A', 'B'])
+        assert sl.items() == ['A', 'B', 'C']  # Kept in order
+        assert len(sl) == 3
+        assert sl.is_empty() is False
+
+    def test_insert_and_contains(self):
+        sl = SkipList(seed=1)
+        for item in (5, 1, 4, 1, 3):
+            sl.insert(item)
+        assert sl.items() == [1, 1, 3, 4, 5]
+        assert sl.contains(4) is True
+        assert 2 not in sl
+        assert sl.contains(6) is False
+
+    def test_get_at_index(self):
+        sl = SkipList(range(0, 200, 2), seed=2)
+        for index in range(100):
+            assert sl.get_at_index(index) == index * 2
+        with self.assertRaises(ValueError):
+            sl.get_at_index(100)
+        with self.assertRaises(ValueError):
+            sl.get_at_index(-1)
+
+    def test_rank_and_index(self):
+        sl = SkipList(['B', 'D', 'D', 'F'], seed=3)
+        assert sl.rank('A') == 0
+        assert sl.rank('D') == 1
+        assert sl.rank('E') == 3
+        assert sl.rank('G') == 4
+        assert sl.index('D') == 1
+        assert sl.index('F') == 3
+        with self.assertRaises(ValueError):
+            sl.index('E')
+
+    def test_delete(self):
+        sl = SkipList(['A', 'B', 'B', 'C'], seed=4)
+        sl.delete('B')
+        assert sl.items() == ['A', 'B', 'C']
+        assert sl.get_at_index(2) == 'C'
+        sl.delete('A')
+        sl.delete('C')
+        assert sl.items() == ['B']
+        with self.assertRaises(ValueError):
+            sl.delete('X')  # item not in list
+        assert sl.delete_at_index(0) == 'B'
+        assert sl.is_empty() is True
+        with self.assertRaises(ValueError):
+            sl.delete_at_index(0)
+
+    def test_delete_at_index_removes_that_node(self):
+        sl = SkipList([1.0, 1], seed=7)
+        first, second = sl.items()  # Equal, but not the same object
+        assert sl.delete_at_index(1) is second
+        assert sl.items()[0] is first
+        rng = random.Random(8)
+        sl = SkipList(seed=8)
+        expected = []
+        for step in range(500):
+            # Many equal items: ints, and floats that are distinct objects
+            item = rng.randrange(20)
+            if step % 2:
+                item = float(item)
+            sl.insert(item)
+            expected.insert(bisect.bisect_left(expected, item), item)
+        while expected:
+            index = rng.randrange(len(expected))
+            assert sl.delete_at_index(index) is expected.pop(index)
+            assert sl.length() == len(expected)
+            if index < len(expected):
+                assert sl.get_at_index(index) == expected[index]
+        assert sl.items() == []
+
+    def test_range_and_slice(self):
+        sl = SkipList(range(10), seed=5)
+        assert list(sl.range(3, 7)) == [3, 4, 5, 6]
+        assert list(sl.range(high=2)) == [0, 1]
+        assert list(sl.range(low=8)) == [8, 9]
+        assert list(sl.range(4.5, 5)) == []
+        assert list(sl.slice(2, 5)) == [2, 3, 4]
+        assert list(sl.slice(8, 20)) == [8, 9]
+        assert list(sl.slice(5, 5)) == []
+
+    def test_matches_sorted_list(self):
+        rng = random.Random(6)
+        sl = SkipList(seed=6)
+        expected = []
+        for step in range(2000):
+            item = rng.randrange(500)
+            if expected and rng.random() < 0.4:
+                item = rng.choice(expected)
+                sl.delete(item)
+                expected.remove(item)
+            else:
+                sl.insert(item)
+                expected.append(item)
+                expected.sort()
+        assert sl.items() == expected
+        for index, item in enumerate(expected):
+            assert sl.get_at_index(index) == item
+            assert sl.rank(item) == expected.index(item)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -56,13 +56,12 @@ class LinkedStack(object):
            0, which runs in constant time because the list has a property for
            its size that is used for the comparision. From there, the average
            case will be that our stack is not empty, and therefore we simply
-           have to get the item from head data.
+           have to unlink the head node, without searching the list for an
+           item equal to it.
 
         """
         if self.is_empty() is False:
-            top_item = self.list.head.data
-            self.list.delete(top_item)
-            return top_item
+            return self.list.pop_front()
         else:
             raise ValueError('No items in this stack.')
 
@@ -67,6 +67,15 @@ class StackTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             s.pop()
 
+    def test_pop_duplicates(self):
+        nan = float('nan')
+        s = Stack(['A', nan, 'A'])
+        assert s.pop() == 'A'
+        # NaN is not equal to itself, but is still popped off the top
+        assert s.pop() is nan
+        assert s.pop() == 'A'
+        assert s.is_empty() is True
+
 
 if __name__ == '__main__':
     unittest.main()
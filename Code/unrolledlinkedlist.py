@@ -0,0 +1,260 @@
+#!python
+
+
+class UnrolledNode(object):
+    # A node holds up to the list's capacity of items, in one array
+    __slots__ = ('items', 'next')
+
+    def __init__(self, items=None):
+        """Initialize this node with the given list of items."""
+        self.items = [] if items is None else items
+        self.next = None
+
+    def __repr__(self):
+        """Return a string representation of this node."""
+        return 'UnrolledNode({!r})'.format(self.items)
+
+
+class UnrolledLinkedList(object):
+    '''A linked list whose nodes each hold an array of up to capacity items,
+       rather than a single item.
+
+       Iterating reads each array in order, so there is one node to follow
+       per capacity items, rather than one per item, and one allocation per
+       node. Every node but the last is kept at least half full, so the list
+       takes about n / capacity to 2n / capacity nodes.
+    '''
+    def __init__(self, iterable=None, capacity=64):
+        """Initialize this linked list with the given number of items per
+           node, and append the given items, if any.
+        """
+        if capacity < 2:
+            raise ValueError('Capacity must be at least 2: '
+                             '{}'.format(capacity))
+        self.capacity = capacity
+        self.head = None  # First node
+        self.tail = None  # Last node
+        self.size = 0  # Number of items
+        if iterable is not None:
+            for item in iterable:
+                self.append(item)
+
+    def __str__(self):
+        """Return a formatted string representation of this linked list."""
+        items = ['({!r})'.format(item) for item in self.items()]
+        return '[{}]'.format(' -> '.join(items))
+
+    def __repr__(self):
+        """Return a string representation of this linked list."""
+        return 'UnrolledLinkedList({!r})'.format(self.items())
+
+    def __iter__(self):
+        """Return a generator of the items in this linked list.
+
+           Best and worst case running time: O(n), following only one link
+           per node of up to capacity items.
+
+        """
+        node = self.head
+        while node is not None:
+            yield from node.items
+            node = node.next
+
+    def items(self):
+        """Return a list of all items in this linked list.
+
+           Best and worst case running time: O(n)
+
+        """
+        result = []
+        node = self.head
+        while node is not None:
+            result.extend(node.items)
+            node = node.next
+        return result
+
+    def is_empty(self):
+        """Return True if this linked list is empty, or False."""
+        return self.head is None
+
+    def length(self):
+        """Return the number of items in this linked list.
+
+           Best and worst case running time: O(1), since we keep count.
+
+        """
+        return self.size
+
+    def _locate(self, index):
+        """Return the node holding the item at the given index, and the
+           item's position in that node's array. The index must be in range.
+        """
+        node = self.head
+        while index >= len(node.items):
+            index -= len(node.items)
+            node = node.next
+        return node, index
+
+    def get_at_index(self, index):
+        """Return the item at the given index in this linked list, or
+           raise ValueError if the given index is out of range of the list
+           size.
+
+           Best case running time: O(1) if the index is in the head node.
+
+           Worst case running time: O(n / capacity), since we skip over
+           whole nodes until we reach the one holding the index.
+
+        """
+        if not (0 <= index < self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        node, position = self._locate(index)
+        return node.items[position]
+
+    def _split(self, node):
+        """Move the second half of the given full node's items to a new node
+           after it, and return the new node.
+        """
+        half = len(node.items) // 2
+        new_node = UnrolledNode(node.items[half:])
+        del node.items[half:]
+        new_node.next = node.next
+        node.next = new_node
+        if self.tail is node:
+            self.tail = new_node
+        return new_node
+
+    def insert_at_index(self, index, item):
+        """Insert the given item at the given index in this linked list, or
+           raise ValueError if the given index is out of range of the list
+           size.
+
+           Best case running time: O(1) when appending.
+
+           Worst case running time: O(n / capacity + capacity), to find the
+           node, then shift the items after the index within its array. A
+           full node is first split into two half full ones.
+
+        """
+        if not (0 <= index <= self.size):
+            raise ValueError('List index out of range: {}'.format(index))
+        if index == self.size:
+            self.append(item)
+            return None
+        node, position = self._locate(index)
+        if len(node.items) == self.capacity:
+            new_node = self._split(node)
+            if position > len(node.items):
+                position -= len(node.items)
+                node = new_node
+        node.items.insert(position, item)
+        self.size += 1
+
+    def append(self, item):
+        """Insert the given item at the tail of this linked list.
+
+           Best and worst case running time: O(1), starting a new node when
+           the tail node is full.
+
+        """
+        if self.tail is None or len(self.tail.items) == self.capacity:
+            new_node = UnrolledNode()
+            if self.tail is None:
+                self.head = new_node
+            else:
+                self.tail.next = new_node
+            self.tail = new_node
+        self.tail.items.append(item)
+        self.size += 1
+
+    def prepend(self, item):
+        """Insert the given item at the head of this linked list.
+
+           Best and worst case running time: O(capacity), to shift the items
+           of the head node, which is a constant that does not grow with n.
+
+        """
+        if self.is_empty():
+            self.append(item)
+        else:
+            self.insert_at_index(0, item)
+
+    def find(self, quality):
+        """Return an item from this linked list satisfying the given quality,
+           or None.
+
+           Best case running time: O(1) if item is near the head of the list.
+
+           Worst case running time: O(n) if item is near the tail of the list
+           or not present.
+
+        """
+        for item in self:
+            if quality(item):
+                return item
+        return None
+
+    def _find_node(self, item):
+        """Return the node before the one holding the given item (or None if
+           it is the head), the node holding it, and its position in that
+           node's array, or raise ValueError.
+        """
+        previous = None
+        node = self.head
+        while node is not None:
+            for position, node_item in enumerate(node.items):
+                if node_item == item:
+                    return previous, node, position
+            previous, node = node, node.next
+        raise ValueError('Item not found: {}'.format(item))
+
+    def replace(self, old_item, new_item):
+        """Replace the given old_item in this linked list with given new_item,
+           or raise ValueError if old_item is not found.
+
+           Best case running time: O(1) if the item is near the head.
+
+           Worst case running time: O(n)
+
+        """
+        previous, node, position = self._find_node(old_item)
+        node.items[position] = new_item
+
+    def delete(self, item):
+        """Delete the given item from this linked list, or raise ValueError.
+
+           Best case running time: O(1) if the item is near the head.
+
+           Worst case running time: O(n) to search for the item. If its node
+           falls below half full, it takes items from the next node, or merges
+           with it if they fit in one, which takes O(capacity).
+
+        """
+        previous, node, position = self._find_node(item)
+        del node.items[position]
+        self.size -= 1
+        if not node.items:
+            # Drop the node once it holds nothing
+            self._unlink(previous, node)
+            return None
+        following = node.next
+        if following is not None and len(node.items) < self.capacity // 2:
+            if len(node.items) + len(following.items) <= self.capacity:
+                node.items.extend(following.items)
+                self._unlink(node, following)
+            else:
+                needed = self.capacity // 2 - len(node.items)
+                node.items.extend(following.items[:needed])
+                del following.items[:needed]
+
+    def _unlink(self, previous, node):
+        """Remove the given node, which follows the given previous node (or
+           None if it is the head).
+        """
+        if previous is None:
+            self.head = node.next
+        else:
+            previous.next = node.next
+        if self.tail is node:
+            self.tail = previous
+        node.next = None
@@ -0,0 +1,102 @@
+#!python
+
+from unrolledlinkedlist import UnrolledLinkedList
+import unittest
+
+
+class UnrolledLinkedListTest(unittest.TestCase):
+
+    def assert_nodes(self, ul, lengths):
+        """Check the number of items in each node, from head to tail."""
+        node_lengths = []
+        node = ul.head
+        while node is not None:
+            node_lengths.append(len(node.items))
+            last = node
+            node = node.next
+        assert node_lengths == lengths
+        if lengths:
+            assert ul.tail is last
+
+    def test_init(self):
+        ul = UnrolledLinkedList()
+        assert ul.head is None
+        assert ul.tail is None
+        assert ul.size == 0
+        assert ul.capacity == 64
+        with self.assertRaises(ValueError):
+            UnrolledLinkedList(capacity=1)
+
+    def test_init_with_list(self):
+        ul = UnrolledLinkedList(['A', 'B', 'C', 'D', 'E'], capacity=2)
+        assert ul.items() == ['A', 'B', 'C', 'D', 'E']
+        assert list(ul) == ['A', 'B', 'C', 'D', 'E']
+        assert ul.length() == 5
+        self.assert_nodes(ul, [2, 2, 1])
+
+    def test_append_and_prepend(self):
+        ul = UnrolledLinkedList(capacity=4)
+        for item in 'CDEF':
+            ul.append(item)
+        self.assert_nodes(ul, [4])
+        ul.prepend('B')  # The full head node splits in two
+        self.assert_nodes(ul, [3, 2])
+        ul.prepend('A')
+        ul.append('G')
+        assert ul.items() == list('ABCDEFG')
+        assert str(ul) == "[('A') -> ('B') -> ('C') -> ('D') -> ('E') -> " \
+                          "('F') -> ('G')]"
+
+    def test_get_at_index(self):
+        ul = UnrolledLinkedList(range(100), capacity=8)
+        for index in range(100):
+            assert ul.get_at_index(index) == index
+        with self.assertRaises(ValueError):
+            ul.get_at_index(100)
+        with self.assertRaises(ValueError):
+            ul.get_at_index(-1)
+
+    def test_insert_at_index(self):
+        ul = UnrolledLinkedList(['A', 'B', 'D', 'E'], capacity=4)
+        ul.insert_at_index(2, 'C')  # Splits the full node
+        self.assert_nodes(ul, [3, 2])
+        ul.insert_at_index(5, 'F')
+        ul.insert_at_index(0, '0')
+        assert ul.items() == ['0', 'A', 'B', 'C', 'D', 'E', 'F']
+        assert ul.size == 7
+        with self.assertRaises(ValueError):
+            ul.insert_at_index(8, 'X')
+
+    def test_find_and_replace(self):
+        ul = UnrolledLinkedList(['A', 'B', 'C'], capacity=2)
+        assert ul.find(lambda item: item > 'A') == 'B'
+        assert ul.find(lambda item: item > 'C') is None
+        ul.replace('C', 'D')
+        assert ul.items() == ['A', 'B', 'D']
+        with self.assertRaises(ValueError):
+            ul.replace('X', 'Y')  # item not in list
+
+    def test_delete_rebalances_nodes(self):
+        ul = UnrolledLinkedList(range(18), capacity=6)
+        self.assert_nodes(ul, [6, 6, 6])
+        for item in range(4):
+            ul.delete(item)  # Below half full, it takes items from the next
+        self.assert_nodes(ul, [3, 5, 6])
+        ul.delete(4)
+        ul.delete(5)  # Merged with the next node, since they fit in one
+        self.assert_nodes(ul, [6, 6])
+        assert ul.items() == list(range(6, 18))
+        for item in range(12, 18):
+            ul.delete(item)  # The emptied tail node is unlinked
+        self.assert_nodes(ul, [6])
+        for item in range(6, 12):
+            ul.delete(item)
+        assert ul.is_empty() is True
+        assert ul.tail is None
+        assert ul.size == 0
+        with self.assertRaises(ValueError):
+            ul.delete('X')  # item not in list
+
+
+if __name__ == '__main__':
+    unittest.main()